@@ -1,9 +1,147 @@
-import glob
-import os
+"""
+victor 包的入口：公开名称按需从各子模块加载。
 
-modules = glob.glob(os.path.join(os.path.dirname(__file__), "*.py"))
+`import victor` 只执行本文件，子模块（以及 tqdm、yaml、multiprocessing 等依赖）在第一次访问
+其中的名称时才会导入，`from victor import thread_pool_executor` 与 `victor.utils` 照常可用。
+新增公开函数或类时，需要把名称登记到 `_MODULE_EXPORTS` 中。
+"""
 
-for module in modules:
-    if os.path.isfile(module) and not module.endswith("__init__.py"):
-        module_name = os.path.basename(module)[:-3]
-        exec(f"from .{module_name} import *")
+import importlib
+
+# 不导入 typing（约 10ms），本文件不写类型注解
+_MODULE_EXPORTS = {
+    "accelerate_util": [
+        "TaskError",
+        "ErrorCollector",
+        "thread_pool_executor",
+        "thread_pool_stream",
+        "process_pool_executor",
+        "SharedArrayHandle",
+        "auto_chunk_size",
+        "process_pool_batch_executor",
+        "process_pool_as_completed",
+        "process_pool_timeout_executor",
+        "GuidedChunkQueue",
+        "guided_executor",
+        "PersistentExecutor",
+        "AsyncRateLimiter",
+        "async_pool_executor_async",
+        "async_pool_executor",
+        "AdaptiveConcurrencyController",
+        "thread_pool_adaptive_executor",
+        "backoff_delay",
+    ],
+    "cache_utils": [
+        "ParsedFileCache",
+        "default_file_cache",
+        "cached_load_json_from",
+        "cached_load_object_json_from",
+        "cached_load_yaml_from",
+    ],
+    "checkpoint_util": ["TaskJournal", "default_task_key", "resumable_executor"],
+    "command_utils": [
+        "execute_command",
+        "CommandResult",
+        "run_commands_async",
+        "run_commands",
+    ],
+    "dz_util": [
+        "get_obs_base_url",
+        "split_txt_file",
+        "split_datetime",
+        "plan_datetime_windows",
+        "split_list",
+    ],
+    "file_index": ["IndexChanges", "FileIndex"],
+    "file_utils": [
+        "JSON_BACKEND",
+        "COMPRESSION_EXTENSIONS",
+        "compression_of",
+        "open_compressed",
+        "load_text_from",
+        "read_txt_to_list",
+        "load_text_generator",
+        "load_json_from",
+        "load_object_json_from",
+        "load_list_json_from",
+        "save_json_to",
+        "copy_file_to_folder",
+        "load_yaml_from",
+        "write_list_to_txt",
+        "append_to_file",
+        "BatchedAppender",
+        "read_jsonl",
+        "json_list_to_jsonl",
+        "json_loads",
+        "json_dumps_bytes",
+        "iter_jsonl",
+        "iter_jsonl_batches",
+        "JsonlWriter",
+        "jsonl_byte_ranges",
+        "parallel_iter_jsonl",
+        "fast_copy_file",
+        "bulk_copy",
+    ],
+    "line_index": ["LineIndex", "LineSlice"],
+    "metrics_util": [
+        "LatencyHistogram",
+        "MeasuredCall",
+        "metric_name",
+        "MetricsRegistry",
+        "default_metrics",
+        "timed",
+        "timer",
+    ],
+    "record_io": [
+        "COLUMNAR_EXTENSIONS",
+        "record_format",
+        "ArrowRecordWriter",
+        "open_record_writer",
+        "iter_record_batches",
+        "iter_records",
+    ],
+    "scan_utils": ["ScanEntry", "scan_files", "iter_rsearch"],
+    "tool_types": ["T", "R", "IMAGE_FILE_EXTENSIONS", "PathLike"],
+    "utils": [
+        "install_all_requirements",
+        "is_windows",
+        "get_absolute_path",
+        "clean_or_create_folder",
+        "clean_folder",
+        "bulk_delete",
+        "fast_clean_folder",
+        "clean_file",
+        "search",
+        "rsearch",
+        "list_folders_of_path",
+        "list_files_of_path",
+        "rlist_jsons_of_path",
+        "break_list",
+        "timing_decorator",
+        "fuzzy_get_value",
+        "fuzzy_get_keys",
+        "FuzzyKeyIndex",
+    ],
+}
+
+# 名称 -> 所在子模块
+_EXPORTS = {
+    name: module for module, names in _MODULE_EXPORTS.items() for name in names
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        if name in _MODULE_EXPORTS:
+            return importlib.import_module(f".{name}", __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # 缓存，之后的访问不再经过 __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_MODULE_EXPORTS))
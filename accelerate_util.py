@@ -1,11 +1,221 @@
+import asyncio
+import itertools
+import math
+import pickle
+import queue
+import random
+import threading
 import traceback
 import tqdm
-from typing import Callable, Dict, List, Union, Any, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from collections import deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+    Future,
+)
 import os
+import time
+from functools import partial
 
+import multiprocessing
 from multiprocessing import Pool
+from multiprocessing import resource_tracker
+from multiprocessing.connection import wait as wait_connections
+from multiprocessing.shared_memory import SharedMemory
 
+from .metrics_util import MeasuredCall, MetricsRegistry, metric_name
+
+# 使用私有名称，避免 `from victor.accelerate_util import *` 覆盖调用方的 np
+# 使用私有名称，避免 `from victor.accelerate_util import *` 覆盖调用方的 `np`
+_np = None
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("use_shared_memory=True 需要安装 numpy") from None
+        _np = numpy
+    return _np
+
+
+class TaskError:
+    """
+    单个任务的结构化错误记录：任务下标、任务参数、异常类型与异常信息。
+
+    只保存调用栈摘要（`StackSummary`，不持有栈帧与局部变量，也不读取源码行），
+    traceback 文本在首次访问 `traceback` 属性时才格式化，大量任务失败时
+    不再为每个错误格式化长字符串，也不会因保留异常对象而使各任务的栈帧无法释放。
+    `str(error)` 与旧版错误字符串的格式一致。
+    """
+
+    __slots__ = (
+        "index",
+        "args",
+        "exc_type",
+        "message",
+        "count",
+        "_stack",
+        "_traceback",
+    )
+
+    def __init__(
+        self,
+        index: Optional[int],
+        args: Any,
+        exc_type: str,
+        message: str,
+        stack: Optional[traceback.StackSummary] = None,
+    ) -> None:
+        self.index = index
+        self.args = args
+        self.exc_type = exc_type
+        self.message = message
+        self.count = 1  # 去重合并后的出现次数
+        self._stack = stack
+        self._traceback: Optional[str] = None
+
+    @classmethod
+    def from_exception(
+        cls, index: Optional[int], args: Any, exc: BaseException
+    ) -> "TaskError":
+        # 不保留异常对象：其 __traceback__ 会让任务的全部栈帧及局部变量一直存活
+        return cls.from_captured(index, args, _capture_error(exc))
+
+    @classmethod
+    def from_captured(
+        cls, index: Optional[int], args: Any, captured: Tuple[str, str, Any]
+    ) -> "TaskError":
+        """由子进程中 `_capture_error` 的返回值构造"""
+        exc_type, message, stack = captured
+        return cls(index, args, exc_type, message, stack=stack)
+
+    @property
+    def traceback(self) -> str:
+        if self._traceback is None:
+            if self._stack is not None:
+                self._traceback = (
+                    "Traceback (most recent call last):\n"
+                    + "".join(self._stack.format())
+                    + f"{self.exc_type}: {self.message}\n"
+                )
+            else:
+                self._traceback = ""
+            self._stack = None
+        return self._traceback
+
+    def to_dict(self, with_traceback: bool = False) -> Dict[str, Any]:
+        data = {
+            "index": self.index,
+            "args": self.args,
+            "exc_type": self.exc_type,
+            "message": self.message,
+            "count": self.count,
+        }
+        if with_traceback:
+            data["traceback"] = self.traceback
+        return data
+
+    def __str__(self) -> str:
+        prefix = "任务出错" if self.index is None else f"任务 {self.index} 出错"
+        return f"{prefix}: {self.exc_type}: {self.message}\n{self.traceback}"
+
+    def __repr__(self) -> str:
+        return (
+            f"TaskError(index={self.index!r}, exc_type={self.exc_type!r}, "
+            f"message={self.message!r}, count={self.count})"
+        )
+
+
+def _capture_error(exc: BaseException) -> Tuple[str, str, traceback.StackSummary]:
+    """提取可 pickle 的错误摘要（不持有栈帧），不读取源码行，开销远小于 `format_exc`"""
+    stack = traceback.StackSummary.extract(
+        traceback.walk_tb(exc.__traceback__), lookup_lines=False
+    )
+    return type(exc).__name__, str(exc), stack
+
+
+class ErrorCollector:
+    """
+    汇总任务错误：按异常类型计数，可合并重复错误、限制保留的错误记录数。
+
+    :param max_records: 最多保留的错误记录数，超出后按蓄水池抽样保留，为 None 时全部保留
+    :param dedupe: 是否合并异常类型与异常信息都相同的错误，合并后记录的 `count` 为出现次数
+    :param structured: 为 False 时 `to_result` 中的错误转换为字符串（`str(TaskError)`）
+    """
+
+    def __init__(
+        self,
+        max_records: Optional[int] = None,
+        dedupe: bool = False,
+        structured: bool = True,
+    ) -> None:
+        if max_records is not None and max_records < 0:
+            raise ValueError("max_records 不能小于 0")
+        self.max_records = max_records
+        self.dedupe = dedupe
+        self.structured = structured
+        self.records: List[TaskError] = []
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+        self._offered = 0
+        # (异常类型, 异常信息) -> 保留中的记录；记录被抽样淘汰后置为 None
+        self._seen: Dict[Tuple[str, str], Optional[TaskError]] = {}
+
+    def add(self, error: TaskError) -> None:
+        # 一条记录可以代表多个任务（如全局超时后合并的未派发任务），按其 count 计数
+        self.total += error.count
+        self.counts[error.exc_type] = self.counts.get(error.exc_type, 0) + error.count
+
+        key = (error.exc_type, error.message)
+        if self.dedupe:
+            if key in self._seen:
+                kept = self._seen[key]
+                if kept is not None:
+                    kept.count += error.count
+                return
+
+        self._offered += 1
+        if self.max_records is None or len(self.records) < self.max_records:
+            self.records.append(error)
+        else:
+            slot = random.randrange(self._offered)
+            if slot >= self.max_records:
+                if self.dedupe:
+                    self._seen[key] = None
+                return
+            evicted = self.records[slot]
+            self.records[slot] = error
+            if self.dedupe:
+                self._seen[(evicted.exc_type, evicted.message)] = None
+        if self.dedupe:
+            self._seen[key] = error
+
+    def to_result(self, results: List[Any]) -> Dict[str, Any]:
+        """组装执行器的返回值 {'results', 'errors', 'error_counts'}"""
+        return {
+            "results": results,
+            "errors": self.records if self.structured else [str(e) for e in self.records],
+            "error_counts": dict(self.counts),
+        }
 
 
 def thread_pool_executor(
@@ -13,6 +223,10 @@ def thread_pool_executor(
     tasks: List[Union[Any, Tuple[Any, ...], List[Any]]],
     pool_size: int = 60,
     desc: str = "线程池处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+    structured_errors: bool = False,
 ) -> Dict[str, List[Any]]:
     """
     通用多线程任务处理方法
@@ -21,7 +235,12 @@ def thread_pool_executor(
     :param tasks: 任务列表，每个任务可以是单参数，也可以是一个元组或列表（表示多参数）
     :param pool_size: 线程池的大小，默认为 60
     :param desc: 进度条的描述信息，用于显示任务处理进度
-    :return: 包含结果和错误信息的字典 {'results': [], 'errors': []}
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :param metrics: 指标注册表，传入时以 `模块.函数名` 记录每个任务的耗时
+    :param structured_errors: 为 True 时 'errors' 中为 `TaskError` 记录（含下标、参数、异常类型，
+                              traceback 按需格式化）；默认为 False，与旧版一致返回错误字符串
+    :return: 包含结果和错误信息的字典 {'results': [], 'errors': [str 或 TaskError], 'error_counts': {}}
 
     适用场景：
     - 适用于 I/O 密集型任务（如批量下载、爬虫、数据处理）。
@@ -36,17 +255,19 @@ def thread_pool_executor(
     """
 
     results = []
-    error_msgs = []
+    errors = ErrorCollector(max_errors, dedupe_errors, structured_errors)
+    if metrics is not None:
+        func = metrics.timed()(func)
 
     with tqdm.tqdm(total=len(tasks), desc=desc, leave=True) as pbar:
         with ThreadPoolExecutor(max_workers=pool_size) as executor:
 
-            future_tasks: List[Future[Any]] = [
+            future_tasks: Dict[Future[Any], int] = {
                 executor.submit(
                     func, *task if isinstance(task, (tuple, list)) else (task,)
-                )
-                for task in tasks
-            ]
+                ): index
+                for index, task in enumerate(tasks)
+            }
 
             for future in as_completed(future_tasks):
                 try:
@@ -54,13 +275,119 @@ def thread_pool_executor(
                     if result is not None:
                         results.append(result)
                 except Exception as e:
-                    error_msgs.append(
-                        f"任务出错: {type(e).__name__}: {e}\n{traceback.format_exc()}"
-                    )
+                    # 取出后 future（连同其异常与栈帧）即可释放
+                    index = future_tasks.pop(future)
+                    errors.add(TaskError.from_exception(index, tasks[index], e))
 
                 pbar.update(1)
 
-    return {"results": results, "errors": error_msgs}
+    return errors.to_result(results)
+
+
+def thread_pool_stream(
+    func: Callable[..., Any],
+    tasks: Iterable[Union[Any, Tuple[Any, ...], List[Any]]],
+    pool_size: int = 60,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = False,
+    desc: str = "线程池处理中...",
+    total: Optional[int] = None,
+    on_error: Optional[Callable[[TaskError], Any]] = None,
+    progress: bool = True,
+    metrics: Optional[MetricsRegistry] = None,
+) -> Iterator[Any]:
+    """
+    流式多线程任务处理方法（生成器版本），内存占用与任务总数无关
+
+    :param func: 执行任务的函数，接受一个或多个参数
+    :param tasks: 任意可迭代对象（列表、生成器、`load_text_generator` 的返回值等），
+                  元素规则与 `thread_pool_executor` 相同
+    :param pool_size: 线程池的大小，默认为 60
+    :param max_in_flight: 同时提交（未取走结果）的任务数上限，默认为 `pool_size * 2`
+    :param ordered: 是否按输入顺序产出结果，默认按完成顺序产出
+    :param desc: 进度条的描述信息
+    :param total: 任务总数，仅用于进度条；`tasks` 有 `len()` 时自动获取
+    :param on_error: 任务出错时的回调，接收 `TaskError`；为 None 时通过 `tqdm.write` 打印
+    :param progress: 是否显示进度条，在后台线程中使用时可关闭
+    :param metrics: 指标注册表，传入时以 `模块.函数名` 记录每个任务的耗时
+    :return: 生成器，逐个产出任务的返回值（与 `thread_pool_executor` 一致，忽略 None）
+
+    适用场景：
+    - 千万级任务列表，不希望一次性提交全部任务、保存全部 Future 与结果。
+    - 结果需要边产出边写入（如直接写入 JSONL 文件）。
+
+    使用示例：
+    >>> tasks = load_text_generator("chip_ids.txt")
+    >>> with open("out.jsonl", "w") as f:
+    >>>     for result in thread_pool_stream(query, tasks, ordered=True):
+    >>>         f.write(json.dumps(result) + "\n")
+    """
+
+    if max_in_flight is None:
+        max_in_flight = pool_size * 2
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight 必须大于 0")
+    if total is None and hasattr(tasks, "__len__"):
+        total = len(tasks)
+    if on_error is None:
+
+        def on_error(error: TaskError) -> None:
+            tqdm.tqdm.write(str(error))
+
+    if metrics is not None:
+        func = metrics.timed()(func)
+    task_iter = enumerate(tasks)
+    # ordered 时按提交顺序保存，否则只作为集合使用
+    pending: deque = deque()
+    # 窗口内任务的 (下标, 参数)，用于构造错误记录
+    pending_tasks: Dict[Future, Tuple[int, Any]] = {}
+
+    def submit_next(executor: ThreadPoolExecutor) -> bool:
+        for index, task in task_iter:
+            future = executor.submit(
+                func, *task if isinstance(task, (tuple, list)) else (task,)
+            )
+            pending.append(future)
+            pending_tasks[future] = (index, task)
+            return True
+        return False
+
+    def collect(future: Future) -> Tuple[bool, Any]:
+        index, task = pending_tasks.pop(future)
+        try:
+            return True, future.result()
+        except Exception as e:
+            on_error(TaskError.from_exception(index, task, e))
+            return False, None
+
+    with tqdm.tqdm(total=total, desc=desc, leave=True, disable=not progress) as pbar:
+        executor = ThreadPoolExecutor(max_workers=pool_size)
+        try:
+            while len(pending) < max_in_flight and submit_next(executor):
+                pass
+
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [f for f in pending if f in finished]
+                    for future in done:
+                        pending.remove(future)
+
+                for future in done:
+                    ok, result = collect(future)
+                    pbar.update(1)
+                    if ok and result is not None:
+                        yield result
+
+                while len(pending) < max_in_flight and submit_next(executor):
+                    pass
+        finally:
+            # 消费方提前结束迭代时，取消尚未开始执行的任务
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
 
 
 def process_pool_executor(
@@ -68,6 +395,11 @@ def process_pool_executor(
     tasks: List[Union[Any, Tuple[Any, ...], List[Any]]],
     pool_size: int = 8,  # 让 `pool_size=None` 时自动匹配 CPU 核心数
     desc: str = "进程池处理中...",
+    use_shared_memory: bool = False,
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+    structured_errors: bool = False,
 ) -> Dict[str, List[Any]]:
     """
     使用 `multiprocessing.Pool` 并行执行任务，并获取返回值，带 `tqdm` 进度条。
@@ -76,11 +408,19 @@ def process_pool_executor(
     :param tasks: 任务列表，每个任务可以是单参数，也可以是一个元组/列表（多参数）
     :param pool_size: 进程池大小，默认为 `os.cpu_count()`(CPU 核心数）
     :param desc: 进度条描述信息
-    :return: 字典 {'results': 任务返回值列表, 'errors': 错误信息列表}
+    :param use_shared_memory: 是否通过 `multiprocessing.shared_memory` 传递 NumPy 数组。
+                              开启后任务中的数组参数与数组返回值放入共享内存块，
+                              进程间只传递轻量句柄；任务结束（无论成败）后共享内存块即被释放
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :param metrics: 指标注册表，传入时在子进程中计时，由父进程以 `模块.函数名` 记录每个任务的耗时
+    :param structured_errors: 为 True 时 'errors' 中为 `TaskError` 记录；默认为 False，返回错误字符串
+    :return: 字典 {'results': 任务返回值列表, 'errors': [str 或 TaskError], 'error_counts': {类型: 次数}}
 
     适用场景：
     - 计算密集型任务（如数据处理、深度学习计算）
     - 大量独立任务的并行执行（如批量图像处理）
+    - 参数/返回值为大尺寸 NumPy 数组（如图像切片）时，配合 `use_shared_memory=True`
 
     使用示例：
     >>> def square(x):
@@ -92,14 +432,848 @@ def process_pool_executor(
 
     if pool_size is None:
         pool_size = os.cpu_count() or 8
+    if use_shared_memory:
+        _numpy()
+        # 在创建进程池前启动 resource_tracker，使子进程与父进程共用同一个，
+        # 否则子进程各自登记的共享内存块会在退出时被误报为泄漏
+        resource_tracker.ensure_running()
+
+    results = []
+    errors = ErrorCollector(max_errors, dedupe_errors, structured_errors)
+    histogram = metrics.histogram(metric_name(func)) if metrics is not None else None
+    target = partial(_shared_memory_call, func) if use_shared_memory else func
+    if histogram is not None:
+        target = MeasuredCall(target)
+    # 共享内存模式下只让有限个任务的数组同时位于共享内存中（取走结果后再提交下一个），
+    # 否则全部输入会在 /dev/shm 中再复制一份，峰值内存翻倍，容器中还可能因 /dev/shm 写满而 SIGBUS
+    max_in_flight = 2 * pool_size if use_shared_memory else max(len(tasks), 1)
+    in_flight: Deque[Tuple[int, Any, List[SharedMemory]]] = deque()
+    task_iter = enumerate(tasks)
+
+    try:
+        with Pool(processes=pool_size) as pool:
+            with tqdm.tqdm(total=len(tasks), desc=desc, unit="task", leave=True) as pbar:
+                while True:
+                    for i, task in itertools.islice(task_iter, max_in_flight - len(in_flight)):
+                        args = task if isinstance(task, (tuple, list)) else (task,)
+                        blocks: List[SharedMemory] = []
+                        if use_shared_memory:
+                            args, blocks = _share_args(args)
+                            # _shared_memory_call 的参数元组整体作为一个参数传入
+                            args = (args,)
+                        in_flight.append((i, pool.apply_async(target, args=args), blocks))
+                    if not in_flight:
+                        break
+
+                    i, future, blocks = in_flight.popleft()
+                    try:
+                        result = future.get()
+                        if histogram is not None:
+                            elapsed_ns, result = result
+                            histogram.record(elapsed_ns)
+                        if use_shared_memory:
+                            result = _collect_shared(result)
+                        results.append(result)
+                    except Exception as e:
+                        if histogram is not None:
+                            histogram.record_error()
+                        errors.add(TaskError.from_exception(i, tasks[i], e))
+                    finally:
+                        _release_blocks(blocks)
+                    pbar.update(1)
+    finally:
+        for _, _, blocks in in_flight:
+            _release_blocks(blocks)
+
+    return errors.to_result(results)
+
+
+class SharedArrayHandle:
+    """
+    共享内存中 NumPy 数组的轻量句柄，跨进程传递时只序列化名称、形状与数据类型
+    """
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str) -> None:
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return self.name, self.shape, self.dtype
+
+    def __setstate__(self, state) -> None:
+        self.name, self.shape, self.dtype = state
+
+    def __repr__(self) -> str:
+        return f"SharedArrayHandle({self.name!r}, {self.shape}, {self.dtype!r})"
+
+
+def _is_shareable(value: Any) -> bool:
+    return _np is not None and isinstance(value, _np.ndarray) and not value.dtype.hasobject
+
+
+def _to_shared(array: "numpy.ndarray") -> Tuple[SharedArrayHandle, SharedMemory]:
+    """把数组复制到新建的共享内存块中，返回句柄与共享内存对象"""
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    _np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return SharedArrayHandle(shm.name, array.shape, array.dtype.str), shm
+
+
+def _attach_shared(handle: SharedArrayHandle) -> Tuple["numpy.ndarray", SharedMemory]:
+    """按句柄挂载共享内存，返回直接引用共享内存的数组视图（零拷贝）"""
+    shm = SharedMemory(name=handle.name)
+    return _numpy().ndarray(handle.shape, dtype=handle.dtype, buffer=shm.buf), shm
+
+
+def _release_blocks(blocks: List[SharedMemory]) -> None:
+    """关闭并删除共享内存块，可重复调用"""
+    while blocks:
+        shm = blocks.pop()
+        try:
+            shm.close()
+        except BufferError:
+            pass
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _share_args(args: Tuple[Any, ...]) -> Tuple[Tuple[Any, ...], List[SharedMemory]]:
+    """把参数中的数组替换为共享内存句柄"""
+    blocks = []
+    shared_args = []
+    try:
+        for arg in args:
+            if _is_shareable(arg):
+                handle, shm = _to_shared(arg)
+                blocks.append(shm)
+                arg = handle
+            shared_args.append(arg)
+    except Exception:
+        _release_blocks(blocks)
+        raise
+    return tuple(shared_args), blocks
+
+
+def _shared_memory_call(func: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+    """
+    子进程中执行：把句柄还原为共享内存上的数组视图后调用 `func`，
+    数组返回值写入新的共享内存块并以句柄返回，由父进程读取后删除
+    """
+    attached = []
+    try:
+        call_args = []
+        for arg in args:
+            if isinstance(arg, SharedArrayHandle):
+                arg, shm = _attach_shared(arg)
+                attached.append(shm)
+            call_args.append(arg)
+        result = func(*call_args)
+        if _is_shareable(result):
+            handle, shm = _to_shared(result)
+            shm.close()
+            result = handle
+        return result
+    finally:
+        call_args = result = arg = None
+        for shm in attached:
+            try:
+                shm.close()
+            except BufferError:
+                # func 仍持有数组视图时无法关闭映射，交由进程回收
+                pass
+
+
+def _collect_shared(result: Any) -> Any:
+    """父进程中执行：把结果句柄读取为普通数组并删除对应的共享内存块"""
+    if not isinstance(result, SharedArrayHandle):
+        return result
+    view, shm = _attach_shared(result)
+    try:
+        return view.copy()
+    finally:
+        del view
+        _release_blocks([shm])
+
+
+def _run_chunk(func: Callable[..., Any], chunk: List[Any]) -> List[Tuple[bool, Any]]:
+    """在子进程中依次执行一批任务，返回 (是否成功, 结果或错误摘要) 列表"""
+    outputs = []
+    for task in chunk:
+        try:
+            outputs.append(
+                (True, func(*task if isinstance(task, (tuple, list)) else (task,)))
+            )
+        except Exception as e:
+            outputs.append((False, _capture_error(e)))
+    return outputs
+
+
+def auto_chunk_size(task_count: int, pool_size: int, factor: int = 4) -> int:
+    """
+    根据任务数与进程数估算批大小，与 `Pool.map` 的策略一致：每个进程约分到 `factor` 批
+
+    :param task_count: 任务总数
+    :param pool_size: 进程数
+    :param factor: 每个进程分到的批数，越大负载越均衡，越小 IPC 次数越少
+    :return: 批大小（至少为 1）
+    """
+    chunk_size, extra = divmod(task_count, pool_size * factor)
+    if extra:
+        chunk_size += 1
+    return max(chunk_size, 1)
+
+
+def process_pool_batch_executor(
+    func: Callable[..., Any],
+    tasks: List[Union[Any, Tuple[Any, ...], List[Any]]],
+    pool_size: int = 8,
+    chunk_size: Optional[int] = None,
+    desc: str = "进程池处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> Dict[str, List[Any]]:
+    """
+    分批派发任务的进程池：每次 IPC 传输一批任务参数，在子进程内逐个执行后批量返回结果。
+
+    与 `process_pool_executor` 的区别在于不再为每个任务单独调用 `apply_async`，
+    对于大量耗时很短的 CPU 任务，序列化与管道通信的开销可以降低一到两个数量级。
+
+    :param func: 需要并行执行的函数（需可被 pickle，即模块顶层函数）
+    :param tasks: 任务列表，每个任务可以是单参数，也可以是一个元组/列表（多参数）
+    :param pool_size: 进程池大小，为 None 时使用 CPU 核心数
+    :param chunk_size: 每批任务数，为 None 时由 `auto_chunk_size` 自动估算
+    :param desc: 进度条描述信息
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :param metrics: 指标注册表，传入时在子进程中计时，由父进程以 `模块.函数名` 记录每个任务的耗时
+    :return: 字典 {'results': 任务返回值列表（按输入顺序）, 'errors': [TaskError],
+             'error_counts': {类型: 次数}}
+
+    使用示例：
+    >>> def square(x):
+    >>>     return x * x
+    >>> result = process_pool_batch_executor(square, list(range(100000)))
+    >>> print(result["results"][:5])  # [0, 1, 4, 9, 16]
+    """
+
+    if pool_size is None:
+        pool_size = os.cpu_count() or 8
+    if chunk_size is None:
+        chunk_size = auto_chunk_size(len(tasks), pool_size)
+    if chunk_size < 1:
+        raise ValueError("chunk_size 必须大于 0")
 
     results = []
-    error_msgs = []
+    errors = ErrorCollector(max_errors, dedupe_errors)
+
+    histogram = metrics.histogram(metric_name(func)) if metrics is not None else None
+    chunks = (tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size))
+    index = 0
 
     with Pool(processes=pool_size) as pool:
-        future_results = [
+        with tqdm.tqdm(total=len(tasks), desc=desc, unit="task", leave=True) as pbar:
+            target = MeasuredCall(func) if histogram is not None else func
+            for outputs in pool.imap(partial(_run_chunk, target), chunks):
+                for ok, value in outputs:
+                    if ok:
+                        if histogram is not None:
+                            elapsed_ns, value = value
+                            histogram.record(elapsed_ns)
+                        results.append(value)
+                    else:
+                        if histogram is not None:
+                            histogram.record_error()
+                        errors.add(TaskError.from_captured(index, tasks[index], value))
+                    index += 1
+                pbar.update(len(outputs))
+
+    return errors.to_result(results)
+
+
+def _timeout_worker(func: Callable[..., Any], conn) -> None:
+    """子进程循环：从管道接收 (index, task)，执行后发回 (index, 是否成功, 结果或错误摘要)"""
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            break
+        if item is None:
+            break
+        index, task = item
+        try:
+            conn.send(
+                (index, True, func(*task if isinstance(task, (tuple, list)) else (task,)))
+            )
+        except Exception as e:
+            conn.send((index, False, _capture_error(e)))
+    conn.close()
+
+
+# 任务参数无法 pickle 时 `Connection.send` 抛出的异常（序列化在写入管道之前完成，管道不受影响）
+_UNPICKLABLE_ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+_KILL_GRACE_SECONDS = 5
+
+
+class _TimeoutWorker:
+    """`process_pool_as_completed` 使用的单个工作进程及其当前任务"""
+
+    __slots__ = ("process", "conn", "index", "task", "started")
+
+    def __init__(self, func: Callable[..., Any], ctx) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_timeout_worker, args=(func, child_conn), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.index: Optional[int] = None
+        self.task: Any = None
+        self.started = 0.0
+
+    def assign(self, index: int, task: Any) -> None:
+        self.index = index
+        self.task = task
+        self.started = time.monotonic()
+        self.conn.send((index, task))
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.process.join(timeout=_KILL_GRACE_SECONDS)
+        if self.process.is_alive():
+            # 忽略 SIGTERM 的进程
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def process_pool_as_completed(
+    func: Callable[..., Any],
+    tasks: Iterable[Union[Any, Tuple[Any, ...], List[Any]]],
+    pool_size: int = 8,
+    timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+) -> Iterator[Tuple[int, bool, Any]]:
+    """
+    按完成顺序产出结果的进程池（生成器），支持单任务超时、全局超时与工作进程替换。
+
+    每个工作进程同一时刻只执行一个任务，任务按需从 `tasks` 中取出，因此可以传入生成器。
+    单个任务超时或工作进程崩溃时，会终止该进程并启动新的进程接替，其余任务不受影响。
+
+    :param func: 需要并行执行的函数（需可被 pickle，即模块顶层函数）
+    :param tasks: 任务可迭代对象，每个任务可以是单参数，也可以是一个元组/列表（多参数）
+    :param pool_size: 进程数，为 None 时使用 CPU 核心数
+    :param timeout: 单个任务的超时时间（秒），为 None 时不限制
+    :param total_timeout: 全部任务的超时时间（秒），超时后正在执行的任务逐个记为失败；
+                          尚未派发的任务不再从 `tasks` 中取出，合并为一条下标为 None 的
+                          `TaskError`，其 `count` 为剩余任务数（`tasks` 没有长度时为 1）
+    :return: 生成器，产出 (任务下标, 是否成功, 结果或 `TaskError`)
+    """
+
+    if pool_size is None:
+        pool_size = os.cpu_count() or 8
+
+    ctx = multiprocessing.get_context()
+    task_iter = enumerate(tasks)
+    deadline = None if total_timeout is None else time.monotonic() + total_timeout
+    workers = [_TimeoutWorker(func, ctx) for _ in range(pool_size)]
+    exhausted = False
+
+    try:
+        while True:
+            for i, worker in enumerate(workers):
+                while worker.index is None and not exhausted:
+                    try:
+                        index, task = next(task_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    try:
+                        worker.assign(index, task)
+                    except _UNPICKLABLE_ERRORS as e:
+                        # 该任务记为失败，进程不受影响，继续派发下一个任务
+                        worker.index = worker.task = None
+                        yield index, False, TaskError.from_exception(index, task, e)
+                    except OSError:
+                        # 进程在空闲时意外退出，换一个新进程重新派发
+                        worker.kill()
+                        workers[i] = worker = _TimeoutWorker(func, ctx)
+                        worker.assign(index, task)
+
+            busy = [w for w in workers if w.index is not None]
+            if not busy:
+                break
+
+            now = time.monotonic()
+            wait_timeout = None
+            if timeout is not None:
+                wait_timeout = max(min(w.started for w in busy) + timeout - now, 0)
+            if deadline is not None:
+                remaining = max(deadline - now, 0)
+                wait_timeout = (
+                    remaining if wait_timeout is None else min(wait_timeout, remaining)
+                )
+
+            ready = set(
+                wait_connections(
+                    [w.conn for w in busy] + [w.process.sentinel for w in busy],
+                    timeout=wait_timeout,
+                )
+            )
+
+            now = time.monotonic()
+            for worker in busy:
+                index, task = worker.index, worker.task
+                if worker.conn in ready:
+                    try:
+                        _, ok, value = worker.conn.recv()
+                    except (EOFError, OSError):
+                        pass
+                    else:
+                        worker.index = worker.task = None
+                        if not ok:
+                            value = TaskError.from_captured(index, task, value)
+                        yield index, ok, value
+                        continue
+                elif worker.process.sentinel not in ready and (
+                    timeout is None or now - worker.started < timeout
+                ):
+                    continue
+
+                timed_out = timeout is not None and now - worker.started >= timeout
+                if worker.process.is_alive() and timed_out:
+                    error = TaskError(
+                        index,
+                        task,
+                        "TimeoutError",
+                        f"任务执行超过 {timeout} 秒，已终止工作进程",
+                    )
+                else:
+                    worker.process.join()
+                    error = TaskError(
+                        index,
+                        task,
+                        "WorkerCrashed",
+                        f"工作进程异常退出 (exitcode={worker.process.exitcode})",
+                    )
+                worker.kill()
+                workers[workers.index(worker)] = _TimeoutWorker(func, ctx)
+                yield index, False, error
+
+            if deadline is not None and time.monotonic() >= deadline:
+                message = f"超过全局超时时间 {total_timeout} 秒，任务未完成"
+                for worker in workers:
+                    if worker.index is not None:
+                        worker.kill()
+                        yield worker.index, False, TaskError(
+                            worker.index, worker.task, "TimeoutError", message
+                        )
+                        worker.index = worker.task = None
+                if not exhausted:
+                    # 只取一个任务判断是否还有剩余，不遍历（可能无限长的）生成器
+                    first = next(task_iter, None)
+                    if first is not None:
+                        remaining = len(tasks) - first[0] if hasattr(tasks, "__len__") else None
+                        error = TaskError(
+                            None,
+                            None,
+                            "TimeoutError",
+                            f"{message}，从下标 {first[0]} 起的"
+                            f"{'' if remaining is None else f' {remaining} 个'}任务未派发",
+                        )
+                        error.count = remaining or 1
+                        yield None, False, error
+                break
+    finally:
+        idle = [w for w in workers if w.index is None and w.process.is_alive()]
+        for worker in idle:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in idle:
+            worker.process.join(timeout=1)
+        for worker in workers:
+            worker.kill()
+
+
+def process_pool_timeout_executor(
+    func: Callable[..., Any],
+    tasks: Iterable[Union[Any, Tuple[Any, ...], List[Any]]],
+    pool_size: int = 8,
+    timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+    desc: str = "进程池处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> Dict[str, List[Any]]:
+    """
+    带超时控制的进程池，按完成顺序收集结果，慢任务不会阻塞其后任务的收集与进度条。
+
+    :param func: 需要并行执行的函数（需可被 pickle，即模块顶层函数）
+    :param tasks: 任务列表/可迭代对象，每个任务可以是单参数，也可以是一个元组/列表（多参数）
+    :param pool_size: 进程数，为 None 时使用 CPU 核心数
+    :param timeout: 单个任务的超时时间（秒），超时的任务记为失败，其工作进程被替换
+    :param total_timeout: 全部任务的超时时间（秒）
+    :param desc: 进度条描述信息
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :param metrics: 指标注册表，传入时在子进程中计时，由父进程以 `模块.函数名` 记录每个任务的耗时，
+                    超时与工作进程崩溃的任务记为失败
+    :return: 字典 {'results': [(任务下标, 返回值), ...], 'errors': [TaskError],
+             'error_counts': {类型: 次数}}，
+             结果按完成顺序排列，需要输入顺序时可 `sorted(results)` 或按下标重排
+
+    使用示例：
+    >>> result = process_pool_timeout_executor(render, tiles, timeout=30)
+    >>> ordered = [value for _, value in sorted(result["results"], key=lambda x: x[0])]
+    """
+
+    results = []
+    errors = ErrorCollector(max_errors, dedupe_errors)
+    total = len(tasks) if hasattr(tasks, "__len__") else None
+    histogram = metrics.histogram(metric_name(func)) if metrics is not None else None
+    target = MeasuredCall(func) if histogram is not None else func
+
+    with tqdm.tqdm(total=total, desc=desc, unit="task", leave=True) as pbar:
+        for index, ok, value in process_pool_as_completed(
+            target, tasks, pool_size, timeout=timeout, total_timeout=total_timeout
+        ):
+            if ok:
+                if histogram is not None:
+                    elapsed_ns, value = value
+                    histogram.record(elapsed_ns)
+                results.append((index, value))
+                pbar.update(1)
+            else:
+                # 全局超时后未派发的任务（index 为 None）没有执行，不计入调用
+                if histogram is not None and index is not None:
+                    histogram.record_error()
+                errors.add(value)
+                pbar.update(value.count)
+
+    return errors.to_result(results)
+
+
+class GuidedChunkQueue:
+    """
+    引导式调度（guided scheduling）的共享任务块队列：每次取出的块大小与剩余工作量成正比，
+    开始时块大、调度开销小，临近结束时块逐渐缩小到 `min_chunk`，避免最后一个大块拖慢整体。
+
+    提供 `costs`（每个任务的预估耗时，任意单位）时按剩余总成本而不是剩余任务数划分块，
+    耗时悬殊的任务不会被装进同一个块；`largest_first=True` 时先派发成本最高的任务，
+    进一步缩短尾部等待。
+
+    线程安全，可以直接被多个线程共享；进程池场景由 `guided_executor` 在父进程中按需取块派发。
+
+    :param tasks: 任务列表
+    :param workers: 并行的 worker 数
+    :param min_chunk: 最小块大小（任务数）
+    :param costs: 与 `tasks` 等长的预估成本列表，为 None 时每个任务成本相同
+    :param largest_first: 是否按成本从高到低派发（需要提供 `costs`）
+    :param factor: 每次取出剩余工作量的 1 / (factor * workers)，越大块越小、越均衡
+
+    使用示例：
+    >>> queue = GuidedChunkQueue(tasks, workers=8)
+    >>> while (chunk := queue.next_chunk()) is not None:
+    >>>     for index, task in chunk:
+    >>>         handle(task)
+    """
+
+    def __init__(
+        self,
+        tasks: List[Any],
+        workers: int,
+        min_chunk: int = 1,
+        costs: Optional[List[float]] = None,
+        largest_first: bool = False,
+        factor: float = 2.0,
+    ) -> None:
+        if workers < 1 or min_chunk < 1:
+            raise ValueError("workers 与 min_chunk 必须大于 0")
+        if costs is not None and len(costs) != len(tasks):
+            raise ValueError("costs 的长度需与 tasks 一致")
+        if largest_first and costs is None:
+            raise ValueError("largest_first=True 需要提供 costs")
+        self.tasks = tasks
+        self.workers = workers
+        self.min_chunk = min_chunk
+        self.factor = factor
+        self._costs = costs
+        self._order = (
+            sorted(range(len(tasks)), key=costs.__getitem__, reverse=True)
+            if largest_first
+            else None
+        )
+        self._position = 0
+        self._remaining_cost = float(sum(costs)) if costs is not None else 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """剩余的任务数"""
+        return len(self.tasks) - self._position
+
+    def next_chunk(self) -> Optional[List[Tuple[int, Any]]]:
+        """取出下一个任务块 [(任务下标, 任务), ...]，全部取完后返回 None"""
+        with self._lock:
+            start = self._position
+            total = len(self.tasks)
+            if start >= total:
+                return None
+            divisor = self.factor * self.workers
+            if self._costs is None:
+                stop = start + max(self.min_chunk, math.ceil((total - start) / divisor))
+            else:
+                budget = self._remaining_cost / divisor
+                stop, taken = start, 0.0
+                while stop < total and (
+                    stop - start < self.min_chunk or taken < budget
+                ):
+                    taken += self._costs[self._index(stop)]
+                    stop += 1
+                self._remaining_cost -= taken
+            stop = min(stop, total)
+            self._position = stop
+        return [(self._index(i), self.tasks[self._index(i)]) for i in range(start, stop)]
+
+    def _index(self, position: int) -> int:
+        return self._order[position] if self._order is not None else position
+
+
+def _run_indexed_chunk(
+    func: Callable[..., Any], chunk: List[Tuple[int, Any]]
+) -> Tuple[List[int], List[Tuple[bool, Any]]]:
+    """执行一个任务块，返回 (任务下标列表, `_run_chunk` 的输出)，需为模块顶层函数以便 pickle"""
+    return [index for index, _ in chunk], _run_chunk(func, [task for _, task in chunk])
+
+
+def guided_executor(
+    func: Callable[..., Any],
+    tasks: List[Union[Any, Tuple[Any, ...], List[Any]]],
+    kind: str = "thread",
+    pool_size: Optional[int] = None,
+    min_chunk: int = 1,
+    costs: Optional[List[float]] = None,
+    largest_first: bool = False,
+    desc: str = "引导式调度处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> Dict[str, List[Any]]:
+    """
+    动态负载均衡的任务执行：任务不再预先按数量静态切分（`split_list`/`break_list`），
+    而是由 `GuidedChunkQueue` 按剩余工作量动态切块，哪个 worker 空闲就把下一块派给谁。
+    任务耗时悬殊（如按日期切分、部分日期数据量大）时，整体耗时接近 总工作量 / worker 数。
+
+    :param func: 执行任务的函数（进程池时需可被 pickle，即模块顶层函数）
+    :param tasks: 任务列表，每个任务可以是单参数，也可以是一个元组/列表（多参数）
+    :param kind: "thread" 或 "process"
+    :param pool_size: 线程/进程数，为 None 时线程取 60，进程取 CPU 核心数
+    :param min_chunk: 最小块大小，任务很轻（如微秒级）时适当调大以减少调度开销
+    :param costs: 每个任务的预估成本（如文件大小、当天的数据量），用于按成本切块
+    :param largest_first: 是否优先派发成本最高的任务（需要提供 `costs`）
+    :param desc: 进度条描述信息
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :param metrics: 指标注册表，传入时在 worker 中计时，由调用方线程以 `模块.函数名` 记录每个任务的耗时
+    :return: 字典 {'results': 任务返回值列表（按输入顺序）, 'errors': [TaskError],
+             'error_counts': {类型: 次数}}
+
+    使用示例：
+    >>> windows = list(plan_datetime_windows("2025-01-01", "2025-04-01", target_weight=1e6, weight=counts))
+    >>> result = guided_executor(export_range, windows, kind="process", costs=[w for *_, w in windows])
+    """
+
+    if kind not in ("thread", "process"):
+        raise ValueError(f"kind 只能是 'thread' 或 'process'，当前为 {kind!r}")
+    if pool_size is None:
+        pool_size = 60 if kind == "thread" else os.cpu_count() or 8
+    chunk_queue = GuidedChunkQueue(
+        tasks, pool_size, min_chunk, costs=costs, largest_first=largest_first
+    )
+    errors = ErrorCollector(max_errors, dedupe_errors)
+    outputs: List[Any] = [None] * len(tasks)
+    succeeded = [False] * len(tasks)
+    finished: "queue.SimpleQueue" = queue.SimpleQueue()
+    histogram = metrics.histogram(metric_name(func)) if metrics is not None else None
+    worker = partial(_run_indexed_chunk, MeasuredCall(func) if histogram is not None else func)
+
+    if kind == "thread":
+        pool = ThreadPoolExecutor(max_workers=pool_size)
+
+        def submit(chunk) -> None:
+            pool.submit(worker, chunk).add_done_callback(finished.put)
+
+        def take():
+            return finished.get().result()
+
+    else:
+        pool = Pool(processes=pool_size)
+
+        def submit(chunk) -> None:
             pool.apply_async(
-                func, args=task if isinstance(task, (tuple, list)) else (task,)
+                worker, (chunk,), callback=finished.put, error_callback=finished.put
+            )
+
+        def take():
+            value = finished.get()
+            if isinstance(value, BaseException):
+                raise value  # 仅在结果无法 pickle 等派发层面出错时出现
+            return value
+
+    try:
+        with tqdm.tqdm(total=len(tasks), desc=desc, unit="task", leave=True) as pbar:
+            # 每个 worker 保持一个执行中的块和一个排队的块，块在派发时才按剩余工作量确定大小
+            in_flight = 0
+            while in_flight < 2 * pool_size:
+                chunk = chunk_queue.next_chunk()
+                if chunk is None:
+                    break
+                submit(chunk)
+                in_flight += 1
+            while in_flight:
+                indices, chunk_outputs = take()
+                in_flight -= 1
+                chunk = chunk_queue.next_chunk()
+                if chunk is not None:
+                    submit(chunk)
+                    in_flight += 1
+                for index, (ok, value) in zip(indices, chunk_outputs):
+                    if ok:
+                        if histogram is not None:
+                            elapsed_ns, value = value
+                            histogram.record(elapsed_ns)
+                        outputs[index] = value
+                        succeeded[index] = True
+                    else:
+                        if histogram is not None:
+                            histogram.record_error()
+                        errors.add(TaskError.from_captured(index, tasks[index], value))
+                pbar.update(len(indices))
+    finally:
+        if kind == "thread":
+            pool.shutdown(wait=True)
+        else:
+            pool.terminate()
+            pool.join()
+
+    results = [value for value, ok in zip(outputs, succeeded) if ok]
+    return errors.to_result(results)
+
+
+class PersistentExecutor:
+    """
+    常驻的线程池/进程池，多次 `map` 调用之间复用同一批工作线程/进程，
+    避免每次调用都重新创建进程、重新导入模块。
+
+    `map` 的返回结构与一次性执行器一致：
+    - kind="thread" 时与 `thread_pool_executor` 相同（按完成顺序，忽略 None 结果）
+    - kind="process" 时与 `process_pool_executor` 相同（按输入顺序）
+
+    :param kind: "thread" 或 "process"
+    :param pool_size: 线程/进程数，为 None 时线程池取 60，进程池取 CPU 核心数
+    :param initializer: 每个工作线程/进程启动时执行一次的初始化函数（如加载配置、模型）
+    :param initargs: 初始化函数的参数
+
+    使用示例：
+    >>> with PersistentExecutor("process", initializer=load_model) as executor:
+    >>>     for batch in batches:
+    >>>         result = executor.map(infer, batch)
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        pool_size: Optional[int] = None,
+        initializer: Optional[Callable[..., Any]] = None,
+        initargs: Tuple[Any, ...] = (),
+    ) -> None:
+        if kind == "thread":
+            self.pool_size = pool_size or 60
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.pool_size, initializer=initializer, initargs=initargs
+            )
+        elif kind == "process":
+            self.pool_size = pool_size or os.cpu_count() or 8
+            self._pool = Pool(
+                processes=self.pool_size, initializer=initializer, initargs=initargs
+            )
+        else:
+            raise ValueError(f"kind 只能是 'thread' 或 'process'，当前为 {kind!r}")
+        self.kind = kind
+        self._closed = False
+
+    def map(
+        self,
+        func: Callable[..., Any],
+        tasks: List[Union[Any, Tuple[Any, ...], List[Any]]],
+        desc: Optional[str] = None,
+        max_errors: Optional[int] = None,
+        dedupe_errors: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        structured_errors: bool = False,
+    ) -> Dict[str, List[Any]]:
+        """
+        在常驻池中执行一批任务
+
+        :param func: 执行任务的函数（进程池时需可被 pickle）
+        :param tasks: 任务列表，每个任务可以是单参数，也可以是一个元组或列表（多参数）
+        :param desc: 进度条描述信息
+        :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+        :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+        :param metrics: 指标注册表，传入时以 `模块.函数名` 记录每个任务的耗时
+        :param structured_errors: 与 `thread_pool_executor` 相同
+        :return: 字典 {'results': [], 'errors': [str 或 TaskError], 'error_counts': {}}
+        """
+        if self._closed:
+            raise RuntimeError("PersistentExecutor 已关闭")
+        errors = ErrorCollector(max_errors, dedupe_errors, structured_errors)
+        if self.kind == "thread":
+            return self._thread_map(
+                func, tasks, desc or "线程池处理中...", errors, metrics
+            )
+        return self._process_map(func, tasks, desc or "进程池处理中...", errors, metrics)
+
+    def _thread_map(self, func, tasks, desc, errors, metrics) -> Dict[str, List[Any]]:
+        results = []
+        if metrics is not None:
+            func = metrics.timed()(func)
+
+        with tqdm.tqdm(total=len(tasks), desc=desc, leave=True) as pbar:
+            future_tasks: Dict[Future[Any], int] = {
+                self._pool.submit(
+                    func, *task if isinstance(task, (tuple, list)) else (task,)
+                ): index
+                for index, task in enumerate(tasks)
+            }
+
+            for future in as_completed(future_tasks):
+                try:
+                    result = future.result()
+                    if result is not None:
+                        results.append(result)
+                except Exception as e:
+                    # 取出后 future（连同其异常与栈帧）即可释放
+                    index = future_tasks.pop(future)
+                    errors.add(TaskError.from_exception(index, tasks[index], e))
+
+                pbar.update(1)
+
+        return errors.to_result(results)
+
+    def _process_map(self, func, tasks, desc, errors, metrics) -> Dict[str, List[Any]]:
+        results = []
+        histogram = metrics.histogram(metric_name(func)) if metrics is not None else None
+        target = MeasuredCall(func) if histogram is not None else func
+
+        future_results = [
+            self._pool.apply_async(
+                target, args=task if isinstance(task, (tuple, list)) else (task,)
             )
             for task in tasks
         ]
@@ -107,14 +1281,426 @@ def process_pool_executor(
         with tqdm.tqdm(
             total=len(future_results), desc=desc, unit="task", leave=True
         ) as pbar:
-            for future in future_results:
+            for index, future in enumerate(future_results):
                 try:
-                    results.append(future.get())
+                    result = future.get()
+                    if histogram is not None:
+                        elapsed_ns, result = result
+                        histogram.record(elapsed_ns)
+                    results.append(result)
                 except Exception as e:
-                    tb = traceback.format_exc()
-                    error_msgs.append(
-                        f"任务 {future} 出错: {type(e).__name__}: {e}\n{tb}"
-                    )
+                    if histogram is not None:
+                        histogram.record_error()
+                    errors.add(TaskError.from_exception(index, tasks[index], e))
                 pbar.update(1)
 
-    return {"results": results, "errors": error_msgs}
+        return errors.to_result(results)
+
+    def close(self) -> None:
+        """等待已提交的任务完成后关闭池，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.kind == "thread":
+            self._pool.shutdown(wait=True)
+        else:
+            self._pool.close()
+            self._pool.join()
+
+    def __enter__(self) -> "PersistentExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        if exc_type is not None and self.kind == "process":
+            # 出现异常时不再等待剩余任务
+            self._closed = True
+            self._pool.terminate()
+            self._pool.join()
+            return
+        self.close()
+
+
+class AsyncRateLimiter:
+    """
+    asyncio 下的匀速限流器：保证相邻两次放行的间隔不小于 1 / rate 秒
+
+    :param rate: 每秒允许的请求数
+    """
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        # 读取与更新之间没有 await，单个事件循环内无需加锁
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """
+    重试前的等待时间：指数退避 + 随机抖动，供各执行器与 `run_commands_async` 共用
+
+    :param attempt: 已失败的次数，从 0 开始
+    :param base: 第一次重试的基准等待时间（秒）
+    :param maximum: 等待时间上限（秒），抖动前生效
+    :return: 等待秒数，在 [0.5, 1.0] 倍的 `min(maximum, base * 2 ** attempt)` 之间
+
+    使用示例：
+    >>> await asyncio.sleep(backoff_delay(attempt, 0.5, 30.0))
+    """
+    return min(maximum, base * (2**attempt)) * random.uniform(0.5, 1.0)
+
+
+async def async_pool_executor_async(
+    coro_func: Callable[..., Awaitable[Any]],
+    tasks: Iterable[Union[Any, Tuple[Any, ...], List[Any]]],
+    concurrency: int = 200,
+    rate_limit: Optional[float] = None,
+    max_retries: int = 0,
+    backoff_base: float = 0.5,
+    backoff_max: float = 30.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    desc: str = "协程池处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> Dict[str, List[Any]]:
+    """
+    `async_pool_executor` 的协程版本，可在已有事件循环中直接 await，参数与返回值相同
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency 必须大于 0")
+
+    results = []
+    errors = ErrorCollector(max_errors, dedupe_errors)
+    limiter = AsyncRateLimiter(rate_limit) if rate_limit else None
+    if metrics is not None:
+        # 每次尝试（含重试）单独计时，不含限速与退避的等待时间
+        coro_func = metrics.timed(metric_name(coro_func))(coro_func)
+    task_iter = enumerate(tasks)
+    total = len(tasks) if hasattr(tasks, "__len__") else None
+
+    async def run_one(index: int, task: Any) -> None:
+        args = task if isinstance(task, (tuple, list)) else (task,)
+        for attempt in range(max_retries + 1):
+            if limiter is not None:
+                await limiter.acquire()
+            try:
+                result = await coro_func(*args)
+            except retry_on as e:
+                if attempt < max_retries:
+                    await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_max))
+                    continue
+                errors.add(TaskError.from_exception(index, task, e))
+            except Exception as e:
+                errors.add(TaskError.from_exception(index, task, e))
+            else:
+                if result is not None:
+                    results.append(result)
+            return
+
+    with tqdm.tqdm(total=total, desc=desc, leave=True) as pbar:
+
+        async def worker() -> None:
+            # 固定数量的 worker 协程从同一个迭代器取任务，内存占用与任务总数无关
+            for index, task in task_iter:
+                await run_one(index, task)
+                pbar.update(1)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return errors.to_result(results)
+
+
+def async_pool_executor(
+    coro_func: Callable[..., Awaitable[Any]],
+    tasks: Iterable[Union[Any, Tuple[Any, ...], List[Any]]],
+    concurrency: int = 200,
+    rate_limit: Optional[float] = None,
+    max_retries: int = 0,
+    backoff_base: float = 0.5,
+    backoff_max: float = 30.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    desc: str = "协程池处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> Dict[str, List[Any]]:
+    """
+    基于 asyncio 的并发任务处理方法，可直接替换 `thread_pool_executor` 处理网络 I/O 任务
+
+    :param coro_func: 协程函数（`async def`），接受一个或多个参数
+    :param tasks: 任务列表/可迭代对象，每个任务可以是单参数，也可以是一个元组或列表（多参数）
+    :param concurrency: 同时执行的协程数上限，默认为 200
+    :param rate_limit: 每秒最多发起的调用次数（含重试），为 None 时不限速
+    :param max_retries: 失败后的最大重试次数，默认为 0（不重试）
+    :param backoff_base: 指数退避的基础等待时间（秒），第 n 次重试约等待 base * 2^n 秒
+    :param backoff_max: 单次退避的最长等待时间（秒）
+    :param retry_on: 需要重试的异常类型，其余异常直接记为失败
+    :param desc: 进度条的描述信息
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :param metrics: 指标注册表，传入时以 `模块.函数名` 记录每次调用（含重试）的耗时
+    :return: 包含结果和错误信息的字典 {'results': [], 'errors': [TaskError], 'error_counts': {}}，
+             结果按完成顺序排列，忽略 None
+
+    适用场景：
+    - 大量 HTTP 请求、OBS 下载等网络 I/O 任务，单个事件循环即可支撑远超线程池的并发量。
+
+    使用示例：
+    >>> async def fetch(session, url):
+    >>>     async with session.get(url) as resp:
+    >>>         return await resp.text()
+    >>> result = async_pool_executor(fetch, [(session, u) for u in urls], rate_limit=50)
+    """
+
+    return asyncio.run(
+        async_pool_executor_async(
+            coro_func,
+            tasks,
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+            retry_on=retry_on,
+            desc=desc,
+            max_errors=max_errors,
+            dedupe_errors=dedupe_errors,
+            metrics=metrics,
+        )
+    )
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """已排序序列的分位数（最近秩法），q 取值 0~100"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD（加性增、乘性减）风格的并发度控制器
+
+    每完成约一轮任务（`max(当前并发度, min_samples)` 个）评估一次：
+    - 错误率超过 `error_threshold`，或 p95 延迟超过基线延迟的 `latency_tolerance` 倍时，
+      并发度乘以 `decrease_factor`；
+    - 上一轮增大了并发度、本轮吞吐量却比上一轮下降超过 `throughput_tolerance` 时，
+      说明后端已饱和，同样乘以 `decrease_factor`；
+    - 上一轮增大了并发度、本轮吞吐量没有提升时保持不变（吞吐量不再随并发度增长时放慢增长）；
+    - 否则并发度加 `increase`。
+    延迟分位数只统计成功的任务（失败往往很快返回，会拉低延迟）。基线延迟取历史窗口
+    p50 的最小值，并每轮缓慢上浮，以适应后端性能的长期变化。并发度减小后，
+    忽略减小前已在途任务的样本，避免同一次过载被重复惩罚。
+
+    每次评估都会在 `history` 中追加一条快照：时间、并发度、吞吐量、延迟分位数与错误率。
+    控制器只应在单个线程中调用（执行器的调度线程），不做加锁。
+
+    :param initial: 初始并发度
+    :param min_limit: 并发度下限
+    :param max_limit: 并发度上限
+    :param increase: 每轮加性增长量
+    :param decrease_factor: 乘性减小系数（0~1）
+    :param latency_tolerance: p95 延迟超过基线多少倍视为过载
+    :param error_threshold: 窗口错误率超过该值视为过载
+    :param throughput_tolerance: 增大并发度后吞吐量下降超过该比例视为过载
+    :param min_samples: 每轮评估的最少样本数
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        increase: int = 1,
+        decrease_factor: float = 0.7,
+        latency_tolerance: float = 2.0,
+        error_threshold: float = 0.05,
+        min_samples: int = 10,
+        throughput_tolerance: float = 0.1,
+    ) -> None:
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("需要满足 1 <= min_limit <= max_limit")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor 必须在 (0, 1) 之间")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.error_threshold = error_threshold
+        self.min_samples = min_samples
+        self.throughput_tolerance = throughput_tolerance
+        self.history: List[Dict[str, float]] = []
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._baseline: Optional[float] = None
+        self._cooldown = 0
+        self._last_increased = False  # 上一轮是否增大了并发度
+        self._last_throughput = 0.0
+        self._started = time.monotonic()
+        self._reset_window()
+
+    @property
+    def limit(self) -> int:
+        """当前允许的在途任务数"""
+        return int(self._limit)
+
+    def _reset_window(self) -> None:
+        self._latencies: List[float] = []
+        self._completed = 0
+        self._errors = 0
+        self._window_start = time.monotonic()
+
+    def record(self, latency: float, ok: bool) -> None:
+        """记录一个已完成任务的耗时（秒）与是否成功，必要时调整并发度"""
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            if self._cooldown == 0:
+                self._reset_window()
+            return
+        self._completed += 1
+        if ok:
+            self._latencies.append(latency)
+        else:
+            self._errors += 1
+        if self._completed >= max(self.limit, self.min_samples):
+            self._adjust()
+
+    def _adjust(self) -> None:
+        now = time.monotonic()
+        latencies = sorted(self._latencies)
+        p50 = _percentile(latencies, 50)
+        p95 = _percentile(latencies, 95)
+        error_rate = self._errors / self._completed
+        throughput = self._completed / max(now - self._window_start, 1e-9)
+
+        if latencies:
+            if self._baseline is None:
+                self._baseline = p50
+            else:
+                self._baseline = min(self._baseline * 1.01, p50)
+
+        overloaded = error_rate > self.error_threshold or (
+            bool(self._baseline) and p95 > self._baseline * self.latency_tolerance
+        )
+        if self._last_increased and not overloaded:
+            overloaded = throughput < self._last_throughput * (1 - self.throughput_tolerance)
+        increased = False
+        if overloaded:
+            # 减小前已在途的任务仍会陆续完成，它们反映的是旧并发度下的状态
+            self._cooldown = self.limit
+            self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        elif not self._last_increased or throughput > self._last_throughput:
+            increased = self._limit < self.max_limit
+            self._limit = min(self.max_limit, self._limit + self.increase)
+        self._last_increased = increased
+        self._last_throughput = throughput
+
+        self.history.append(
+            {
+                "time": now - self._started,
+                "limit": self.limit,
+                "throughput": throughput,
+                "p50": p50,
+                "p95": p95,
+                "p99": _percentile(latencies, 99),
+                "error_rate": error_rate,
+            }
+        )
+        self._reset_window()
+
+
+def _timed_call(func: Callable[..., Any], args: Tuple[Any, ...]):
+    """在工作线程中执行任务并计时，返回 (耗时, 是否成功, 结果或异常)，不向外抛出异常"""
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception as e:
+        return time.perf_counter() - start, False, e
+    return time.perf_counter() - start, True, result
+
+
+def thread_pool_adaptive_executor(
+    func: Callable[..., Any],
+    tasks: Iterable[Union[Any, Tuple[Any, ...], List[Any]]],
+    max_workers: int = 256,
+    controller: Optional[AdaptiveConcurrencyController] = None,
+    desc: str = "自适应线程池处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> Dict[str, Any]:
+    """
+    并发度自适应的多线程任务处理方法：根据观测到的延迟、吞吐与错误率动态调整在途任务数，
+    后端限流时自动降低并发，延迟较高但后端尚有余量时自动提高并发。
+
+    :param func: 执行任务的函数，接受一个或多个参数
+    :param tasks: 任务列表/可迭代对象，每个任务可以是单参数，也可以是一个元组或列表（多参数）
+    :param max_workers: 线程数上限，即并发度的硬上限
+    :param controller: 并发度控制器，为 None 时使用默认参数的 `AdaptiveConcurrencyController`
+    :param desc: 进度条的描述信息
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :param metrics: 指标注册表，传入时以 `模块.函数名` 记录每个任务的耗时
+    :return: 字典 {'results': [], 'errors': [TaskError], 'error_counts': {},
+             'concurrency_history': 控制器每轮评估的快照列表}
+
+    使用示例：
+    >>> result = thread_pool_adaptive_executor(download, urls, max_workers=128)
+    >>> for snapshot in result["concurrency_history"]:
+    >>>     print(snapshot["limit"], snapshot["throughput"], snapshot["p95"])
+    """
+
+    if controller is None:
+        controller = AdaptiveConcurrencyController(max_limit=max_workers)
+    results = []
+    errors = ErrorCollector(max_errors, dedupe_errors)
+    histogram = metrics.histogram(metric_name(func)) if metrics is not None else None
+    total = len(tasks) if hasattr(tasks, "__len__") else None
+    task_iter = enumerate(tasks)
+    pending: Dict[Future, Tuple[int, Any]] = {}
+
+    with tqdm.tqdm(total=total, desc=desc, leave=True) as pbar:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def fill() -> None:
+                limit = min(controller.limit, max_workers)
+                while len(pending) < limit:
+                    try:
+                        index, task = next(task_iter)
+                    except StopIteration:
+                        return
+                    args = task if isinstance(task, (tuple, list)) else (task,)
+                    pending[executor.submit(_timed_call, func, args)] = (index, task)
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, task = pending.pop(future)
+                    latency, ok, value = future.result()
+                    controller.record(latency, ok)
+                    if histogram is not None:
+                        histogram.record(int(latency * 1e9), ok)
+                    if ok:
+                        if value is not None:
+                            results.append(value)
+                    else:
+                        errors.add(TaskError.from_exception(index, task, value))
+                    pbar.update(1)
+                pbar.set_postfix(concurrency=controller.limit, refresh=False)
+                fill()
+
+    report = errors.to_result(results)
+    report["concurrency_history"] = controller.history
+    return report
@@ -0,0 +1,91 @@
+"""
+在本地模拟的限流后端上对比固定线程数与 `thread_pool_adaptive_executor`
+
+模拟后端的最佳并发为 CAPACITY：超过后延迟线性增长，超过 1.5 倍时直接返回限流错误。
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_adaptive_concurrency
+"""
+
+import threading
+import time
+
+from victor.accelerate_util import (
+    AdaptiveConcurrencyController,
+    thread_pool_adaptive_executor,
+    thread_pool_executor,
+)
+
+CAPACITY = 32
+BASE_LATENCY = 0.02
+
+
+class SimulatedBackend:
+    def __init__(self, capacity: int, base_latency: float) -> None:
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def call(self, x):
+        with self._lock:
+            self.in_flight += 1
+            current = self.in_flight
+        try:
+            if current > self.capacity * 1.5:
+                time.sleep(self.base_latency / 4)
+                raise RuntimeError("429 Too Many Requests")
+            time.sleep(self.base_latency * max(1.0, current / self.capacity))
+            return x
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _report(name, elapsed, result):
+    errors = sum(result["error_counts"].values())
+    print(
+        f"{name:>14}: {len(result['results']) / elapsed:8.0f} successful tasks/s | "
+        f"errors {errors:5d} | {elapsed:6.2f}s"
+    )
+
+
+def main():
+    tasks = list(range(20000))
+    print(f"capacity={CAPACITY}, base latency={BASE_LATENCY * 1000:.0f}ms")
+
+    for pool_size in (8, 60, 200):
+        backend = SimulatedBackend(CAPACITY, BASE_LATENCY)
+        start = time.perf_counter()
+        result = thread_pool_executor(
+            backend.call, tasks, pool_size, desc=f"fixed {pool_size}"
+        )
+        _report(f"fixed {pool_size}", time.perf_counter() - start, result)
+
+    backend = SimulatedBackend(CAPACITY, BASE_LATENCY)
+    controller = AdaptiveConcurrencyController(initial=4, max_limit=200)
+    start = time.perf_counter()
+    result = thread_pool_adaptive_executor(
+        backend.call, tasks, max_workers=200, controller=controller
+    )
+    _report("adaptive", time.perf_counter() - start, result)
+
+    print("\n  time  limit  tasks/s   p50(ms)  p95(ms)  p99(ms)  err%")
+    history = result["concurrency_history"]
+    for snapshot in history[:: max(len(history) // 25, 1)]:
+        print(
+            f"{snapshot['time']:6.2f} {snapshot['limit']:6d} "
+            f"{snapshot['throughput']:8.0f} {snapshot['p50'] * 1000:9.1f} "
+            f"{snapshot['p95'] * 1000:8.1f} {snapshot['p99'] * 1000:8.1f} "
+            f"{snapshot['error_rate'] * 100:5.1f}"
+        )
+    tail = history[len(history) // 2 :]
+    average = sum(s["limit"] for s in tail) / max(len(tail), 1)
+    print(
+        f"\nsteady-state average concurrency: {average:.1f} "
+        f"(saturates at {CAPACITY}, throttles above {int(CAPACITY * 1.5)})"
+    )
+
+
+if __name__ == "__main__":
+    main()
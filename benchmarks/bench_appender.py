@@ -0,0 +1,67 @@
+"""
+对比多线程同时追加日志时 `append_to_file`（每次打开、写入、关闭文件）与 `BatchedAppender` 的吞吐量
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_appender
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from victor.file_utils import BatchedAppender, append_to_file
+
+THREADS = 8
+LINES_PER_THREAD = 25000
+
+
+def _run_threads(write):
+    def worker(thread_id):
+        for i in range(LINES_PER_THREAD):
+            write(f"thread={thread_id} line={i} chip_id=chip_{i:08d} status=ok")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return start
+
+
+def _report(label, path, start):
+    elapsed = time.perf_counter() - start
+    # 同时统计轮转出的 <path>.1、<path>.2 ...
+    folder, name = os.path.split(path)
+    lines = 0
+    for file_name in os.listdir(folder):
+        if file_name == name or file_name.startswith(name + "."):
+            with open(os.path.join(folder, file_name), "rb") as file:
+                lines += sum(1 for _ in file)
+    print(f"{label:>32}: {lines / elapsed:10.0f} lines/s ({lines} lines, {elapsed:.2f}s)")
+
+
+def main():
+    print(f"{THREADS} threads x {LINES_PER_THREAD} lines")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "append_to_file.log")
+        start = _run_threads(lambda line: append_to_file(path, line))
+        _report("append_to_file", path, start)
+
+        for i, (label, kwargs) in enumerate(
+            (
+                ("BatchedAppender", {}),
+                ('BatchedAppender(fsync="batch")', {"fsync": "batch"}),
+                ("BatchedAppender(max_bytes=1MB)", {"max_bytes": 1024 * 1024, "backup_count": 100}),
+            )
+        ):
+            path = os.path.join(tmp, f"appender{i}.log")
+            appender = BatchedAppender(path, **kwargs)
+            start = _run_threads(appender.write)
+            appender.close()  # 计入写完队列的时间
+            _report(label, path, start)
+
+
+if __name__ == "__main__":
+    main()
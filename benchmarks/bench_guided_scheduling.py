@@ -0,0 +1,115 @@
+"""
+对比静态切分与引导式调度（`guided_executor`）在耗时悬殊的任务上的整体耗时
+
+5% 的任务耗时是其余任务的 40 倍，且集中在一起（类似按日期切分时数据量集中在最近几天）。
+静态切分（`split_list` 每个 worker 一份、`process_pool_batch_executor` 按数量分批）会把
+重任务集中到少数 worker，最慢的一份决定整体耗时。
+
+分别测试重任务位于末尾与开头两种排列：引导式调度的块随剩余工作量缩小，重任务在末尾时
+不提供成本也能均衡；重任务在开头时，前几个大块会装入过多重任务，需要提供 `costs`。
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_guided_scheduling
+"""
+
+import os
+import time
+
+from victor.accelerate_util import (
+    guided_executor,
+    process_pool_batch_executor,
+    process_pool_executor,
+    thread_pool_executor,
+)
+from victor.dz_util import split_list
+
+LIGHT_UNITS = 1
+HEAVY_UNITS = 40
+
+
+def _costs(total: int, heavy_at_end: bool):
+    heavy = int(total * 0.05)
+    costs = [HEAVY_UNITS] * heavy + [LIGHT_UNITS] * (total - heavy)
+    return costs[::-1] if heavy_at_end else costs
+
+
+def sleep_task(units: int) -> int:
+    time.sleep(units * 0.002)
+    return units
+
+
+def spin_task(units: int) -> int:
+    acc = 0
+    for i in range(units * 20000):
+        acc += i
+    return units
+
+
+def run_partition(func, partition):
+    return [func(x) for x in partition]
+
+
+def _report(name: str, elapsed: float, ideal: float) -> None:
+    print(f"{name:>34}: {elapsed:7.2f}s  (x{elapsed / ideal:4.2f} of ideal {ideal:.2f}s)")
+
+
+def _measure(runner):
+    start = time.perf_counter()
+    result = runner()
+    assert not result["errors"], result["errors"][:1]
+    return time.perf_counter() - start
+
+
+def bench(kind, func, unit_seconds, workers, task_count, heavy_at_end):
+    tasks = _costs(task_count, heavy_at_end)
+    ideal = sum(tasks) * unit_seconds / workers
+    layout = "heavy tasks at end" if heavy_at_end else "heavy tasks at start"
+    print(f"\n== {kind}: {task_count} tasks, {workers} workers, {layout} ==")
+
+    partitions = [(func, p) for p in split_list(tasks, workers)]
+    if kind == "thread":
+        static = lambda: thread_pool_executor(run_partition, partitions, workers, desc="static")
+    else:
+        static = lambda: process_pool_executor(run_partition, partitions, workers, desc="static")
+    _report("static split_list", _measure(static), ideal)
+
+    if kind == "process":
+        _report(
+            "process_pool_batch_executor (auto)",
+            _measure(lambda: process_pool_batch_executor(func, tasks, workers, desc="batch")),
+            ideal,
+        )
+    _report(
+        "guided",
+        _measure(lambda: guided_executor(func, tasks, kind, workers, desc="guided")),
+        ideal,
+    )
+    _report(
+        "guided + costs, largest first",
+        _measure(
+            lambda: guided_executor(
+                func, tasks, kind, workers, costs=tasks, largest_first=True, desc="guided+"
+            )
+        ),
+        ideal,
+    )
+
+
+def _unit_seconds(func) -> float:
+    start = time.perf_counter()
+    for _ in range(20):
+        func(LIGHT_UNITS)
+    return (time.perf_counter() - start) / 20
+
+
+def main():
+    workers = os.cpu_count() or 4
+    for heavy_at_end in (True, False):
+        bench("thread", sleep_task, _unit_seconds(sleep_task), 16, 4000, heavy_at_end)
+        bench(
+            "process", spin_task, _unit_seconds(spin_task), workers, 400 * workers, heavy_at_end
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+对比 `import victor` 的冷启动耗时：按需加载（当前）与导入全部子模块（改动前 `__init__` 的行为），
+以及单独导入各模块中轻量函数的耗时（这些模块只在用到并行函数时才导入 accelerate_util 等重依赖）
+
+每种情况都在新的解释器进程中执行，取多次运行的中位数；结果包含解释器自身的启动时间，
+因此同时给出一个只启动解释器的基线。
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_import_time
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import victor
+
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(victor.__file__)))
+RUNS = 15
+
+CASES = {
+    "interpreter only": "pass",
+    "import victor (lazy)": "import victor",
+    "from victor import split_list": "from victor import split_list",
+    "from victor import thread_pool_executor": "from victor import thread_pool_executor",
+    # 轻量工具函数：不应因同模块中的并行函数而导入 accelerate_util/tqdm/asyncio
+    "from victor import load_json_from": "from victor import load_json_from",
+    "from victor import is_windows": "from victor import is_windows",
+    "from victor import execute_command": "from victor import execute_command",
+    "from victor import ParsedFileCache": "from victor import ParsedFileCache",
+    "all submodules (eager, before)": "import importlib, victor\n"
+    "for m in victor._MODULE_EXPORTS: importlib.import_module('victor.' + m)",
+}
+
+
+def _run(code: str) -> float:
+    env = dict(os.environ, PYTHONPATH=PARENT_DIR)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"python {sys.version.split()[0]}, median of {RUNS} cold starts")
+    baseline = None
+    for name, code in CASES.items():
+        _run(code)  # 预热文件系统缓存与 __pycache__
+        median = statistics.median(_run(code) for _ in range(RUNS))
+        if baseline is None:
+            baseline = median
+        print(
+            f"{name:>40}: {median * 1000:7.1f} ms "
+            f"(+{(median - baseline) * 1000:6.1f} ms over interpreter)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+对比 `read_jsonl`/`json_list_to_jsonl` 与流式 `iter_jsonl`/`JsonlWriter` 的吞吐量
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_jsonl
+"""
+
+import os
+import tempfile
+import time
+
+from victor.file_utils import (
+    JSON_BACKEND,
+    JsonlWriter,
+    iter_jsonl,
+    iter_jsonl_batches,
+    json_list_to_jsonl,
+    read_jsonl,
+)
+
+
+def _records(count):
+    return [
+        {
+            "chip_id": f"chip_{i:08d}",
+            "score": i / 7,
+            "tags": ["car", "person", "车道线"],
+            "bbox": [i % 640, i % 480, 32, 64],
+            "meta": {"camera": "front", "frame": i},
+        }
+        for i in range(count)
+    ]
+
+
+def _timed(label, count, path, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    print(
+        f"{label:>28}: {count / elapsed:10.0f} rec/s | "
+        f"{size / elapsed / 1024 / 1024:7.1f} MB/s"
+    )
+
+
+def main():
+    count = 300000
+    records = _records(count)
+    print(f"JSON backend: {JSON_BACKEND}, {count} records")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.jsonl")
+        new_path = os.path.join(tmp, "new.jsonl")
+
+        _timed(
+            "json_list_to_jsonl",
+            count,
+            old_path,
+            lambda: json_list_to_jsonl(records, old_path),
+        )
+
+        def write_new():
+            with JsonlWriter(new_path) as writer:
+                writer.write_many(records)
+
+        _timed("JsonlWriter", count, new_path, write_new)
+
+        _timed("read_jsonl", count, old_path, lambda: read_jsonl(old_path))
+        _timed("iter_jsonl", count, new_path, lambda: sum(1 for _ in iter_jsonl(new_path)))
+        _timed(
+            "iter_jsonl_batches(10000)",
+            count,
+            new_path,
+            lambda: sum(len(b) for b in iter_jsonl_batches(new_path, 10000)),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+对比现有写入方式（`save_json_to` 的 indent=4 JSON、`write_list_to_txt` 逐条写入）与
+`JsonlWriter`（普通 / gzip / zstd / lz4 压缩 JSONL）、`ArrowRecordWriter`（Parquet / Arrow）
+的文件大小与读写吞吐量
+
+未安装的可选依赖（zstandard、lz4、pyarrow）对应的格式会被跳过。
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_output_formats
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from victor.file_utils import JSON_BACKEND, load_json_from, save_json_to, write_list_to_txt
+from victor.record_io import iter_records, open_record_writer
+
+
+def _records(count):
+    return [
+        {
+            "chip_id": f"chip_{i:08d}",
+            "score": i / 7,
+            "label": ("car", "person", "车道线")[i % 3],
+            "bbox": [i % 640, i % 480, 32, 64],
+            "frame": i,
+        }
+        for i in range(count)
+    ]
+
+
+def _measure(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _report(label, count, path, write_seconds, read_seconds, base_size):
+    size = os.path.getsize(path)
+    read = f"{count / read_seconds:10.0f}" if read_seconds else f"{'-':>10}"
+    print(
+        f"{label:>24}: {size / 1024 / 1024:8.1f} MB ({size / base_size:5.1%}) | "
+        f"write {count / write_seconds:10.0f} rec/s | read {read} rec/s"
+    )
+
+
+def main():
+    count = 300000
+    records = _records(count)
+    print(f"JSON backend: {JSON_BACKEND}, {count} records")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "records.json")
+        write_seconds = _measure(lambda: save_json_to(records, tmp, "records.json"))
+        read_seconds = _measure(lambda: load_json_from(json_path))
+        base_size = os.path.getsize(json_path)
+        _report("save_json_to(indent=4)", count, json_path, write_seconds, read_seconds, base_size)
+
+        txt_path = os.path.join(tmp, "records.txt")
+
+        def write_txt():
+            # 计入逐条 json.dumps 的序列化耗时，与其他写入方式可比
+            lines = [json.dumps(record, ensure_ascii=False) for record in records]
+            with contextlib.redirect_stdout(io.StringIO()):
+                write_list_to_txt(txt_path, lines)
+
+        write_seconds = _measure(write_txt)
+        _report("write_list_to_txt", count, txt_path, write_seconds, None, base_size)
+
+        for name in (
+            "records.jsonl",
+            "records.jsonl.gz",
+            "records.jsonl.zst",
+            "records.jsonl.lz4",
+            "records.parquet",
+            "records.arrow",
+        ):
+            path = os.path.join(tmp, name)
+
+            def write():
+                with open_record_writer(path) as writer:
+                    writer.write_many(records)
+
+            try:
+                write_seconds = _measure(write)
+            except ImportError as e:
+                print(f"{name:>24}: skipped ({e})")
+                continue
+            read_seconds = _measure(lambda: sum(1 for _ in iter_records(path)))
+            _report(name, count, path, write_seconds, read_seconds, base_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+`parallel_iter_jsonl` 的解析吞吐量随进程数的变化，与单进程 `read_jsonl`/`iter_jsonl` 对比
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_parallel_jsonl
+"""
+
+import os
+import tempfile
+import time
+
+from victor.file_utils import JsonlWriter, iter_jsonl, parallel_iter_jsonl, read_jsonl
+
+
+def _write_sample(path, count):
+    with JsonlWriter(path) as writer:
+        for i in range(count):
+            writer.write(
+                {
+                    "chip_id": f"chip_{i:08d}",
+                    "objects": [
+                        {"label": "car", "bbox": [i % 640, i % 480, 32, 64], "score": 0.9}
+                        for _ in range(8)
+                    ],
+                    "meta": {"camera": "front", "frame": i, "weather": "晴"},
+                }
+            )
+
+
+def chip_id_of(record):
+    return record["chip_id"]
+
+
+def _timed(label, path, func):
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"{label:>26}: {count / elapsed:10.0f} rec/s | {size_mb / elapsed:7.1f} MB/s")
+    return elapsed
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sample.jsonl")
+        _write_sample(path, 400000)
+        print(f"{os.path.getsize(path) / 1024 / 1024:.0f} MB, {cpu_count} CPU cores")
+
+        _timed("read_jsonl", path, lambda: len(read_jsonl(path)))
+        _timed("iter_jsonl", path, lambda: sum(1 for _ in iter_jsonl(path)))
+
+        pool_sizes = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+        baseline = None
+        for pool_size in pool_sizes:
+            for ordered in (True, False):
+                elapsed = _timed(
+                    f"parallel x{pool_size} ordered={ordered}",
+                    path,
+                    lambda: sum(
+                        1
+                        for _ in parallel_iter_jsonl(
+                            path, pool_size, chunk_bytes=8 * 1024 * 1024, ordered=ordered
+                        )
+                    ),
+                )
+                if ordered:
+                    baseline = baseline or elapsed
+                    print(f"{'speedup':>26}: x{baseline / elapsed:.2f}")
+            _timed(
+                f"parallel x{pool_size} map_func",
+                path,
+                lambda: sum(
+                    1
+                    for _ in parallel_iter_jsonl(
+                        path,
+                        pool_size,
+                        chunk_bytes=8 * 1024 * 1024,
+                        map_func=chip_id_of,
+                    )
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+对比 `process_pool_executor` 与 `process_pool_batch_executor` 在不同批大小下的吞吐量
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_process_chunksize
+"""
+
+import os
+import time
+
+from victor.accelerate_util import (
+    auto_chunk_size,
+    process_pool_batch_executor,
+    process_pool_executor,
+)
+
+
+def tiny_task(x):
+    return x * x
+
+
+def heavy_task(x):
+    return sum(i * i for i in range(20000 + x % 7))
+
+
+def _throughput(runner, tasks):
+    start = time.perf_counter()
+    result = runner(tasks)
+    elapsed = time.perf_counter() - start
+    assert not result["errors"], result["errors"][:1]
+    return len(tasks) / elapsed
+
+
+def main():
+    pool_size = os.cpu_count() or 4
+    cases = [
+        ("tiny", tiny_task, list(range(200000)), [1, 16, 256, 4096]),
+        ("heavy", heavy_task, list(range(2000)), [1, 4, 16, 64]),
+    ]
+    for name, func, tasks, chunk_sizes in cases:
+        print(f"\n== {name} task, {len(tasks)} tasks, {pool_size} processes ==")
+        rate = _throughput(
+            lambda t: process_pool_executor(func, t, pool_size, desc="apply_async"),
+            tasks,
+        )
+        print(f"{'apply_async':>20}: {rate:12.0f} tasks/s")
+
+        auto = auto_chunk_size(len(tasks), pool_size)
+        for chunk_size in chunk_sizes + [auto]:
+            rate = _throughput(
+                lambda t: process_pool_batch_executor(
+                    func, t, pool_size, chunk_size=chunk_size, desc=f"chunk={chunk_size}"
+                ),
+                tasks,
+            )
+            label = f"chunk={chunk_size}" + (" (auto)" if chunk_size == auto else "")
+            print(f"{label:>20}: {rate:12.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    main()
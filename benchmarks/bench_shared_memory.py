@@ -0,0 +1,54 @@
+"""
+对比 `process_pool_executor` 的 pickle 传参与共享内存传参（`use_shared_memory=True`）
+
+运行方式（在 victor 的上级目录执行）：
+    python -m victor.benchmarks.bench_shared_memory
+"""
+
+import os
+import time
+
+import numpy as np
+
+from victor.accelerate_util import process_pool_executor
+
+
+def tile_mean(tile):
+    return float(tile.mean())
+
+
+def tile_scale(tile):
+    return tile * 0.5
+
+
+def _elapsed(func, tasks, pool_size, use_shared_memory):
+    start = time.perf_counter()
+    result = process_pool_executor(
+        func,
+        tasks,
+        pool_size,
+        desc=f"shm={use_shared_memory}",
+        use_shared_memory=use_shared_memory,
+    )
+    elapsed = time.perf_counter() - start
+    assert not result["errors"], result["errors"][:1]
+    return elapsed
+
+
+def main():
+    pool_size = os.cpu_count() or 4
+    for side in (512, 2048):
+        tasks = [np.random.rand(side, side).astype(np.float32) for _ in range(32)]
+        size_mb = sum(t.nbytes for t in tasks) / 1024 / 1024
+        print(f"\n== 32 tiles of {side}x{side} float32 ({size_mb:.0f} MB) ==")
+        for func in (tile_mean, tile_scale):
+            pickled = _elapsed(func, tasks, pool_size, False)
+            shared = _elapsed(func, tasks, pool_size, True)
+            print(
+                f"{func.__name__:>12}: pickle {pickled:7.3f}s | "
+                f"shared_memory {shared:7.3f}s | x{pickled / shared:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
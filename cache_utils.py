@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+from .file_utils import load_json_from, load_yaml_from
+from .tool_types import PathLike
+
+
+_MISSING = object()
+
+
+def _copy_plain(obj: Any) -> Any:
+    """复制 JSON/YAML 解析结果中的可变容器，不可变的标量直接复用，比 deepcopy 快得多"""
+    if isinstance(obj, dict):
+        return {k: _copy_plain(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_plain(v) for v in obj]
+    if isinstance(obj, set):
+        return set(obj)
+    return obj
+
+
+def _freeze(obj: Any) -> Any:
+    """把解析结果转换为只读结构：dict -> MappingProxyType，list -> tuple，set -> frozenset"""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, set):
+        return frozenset(obj)
+    return obj
+
+
+def _file_digest(file_path: PathLike) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _CacheEntry:
+    __slots__ = ("signature", "digest", "value", "cost")
+
+    def __init__(self, signature, digest, value, cost) -> None:
+        self.signature = signature
+        self.digest = digest
+        self.value = value
+        self.cost = cost
+
+
+class ParsedFileCache:
+    """
+    解析结果缓存：以 (文件绝对路径, 解析函数) 为 key，文件的 mtime 与大小不变时直接返回
+    缓存的解析结果，否则重新解析。按 LRU 淘汰，总占用以文件大小乘以 `size_factor` 估算。
+
+    可在线程池中并发使用；同一文件同时未命中时只会解析一次。
+
+    :param max_bytes: 缓存的估算内存上限（字节）
+    :param size_factor: 解析后对象相对文件大小的膨胀系数估计值
+    :param verify_content: 为 True 时命中前还会比对文件内容哈希，
+                           可以发现 mtime 与大小都没变的修改，但每次访问都要读一遍文件
+    :param mode: "copy" 每次返回一份独立的拷贝（调用方可随意修改）；
+                 "freeze" 返回只读结构（dict -> MappingProxyType，list -> tuple），零拷贝共享
+
+    使用示例：
+    >>> cache = ParsedFileCache(max_bytes=512 * 1024 * 1024, mode="freeze")
+    >>> config = cache.get("config.yaml", load_yaml_from)
+    >>> print(cache.stats())
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        size_factor: float = 4.0,
+        verify_content: bool = False,
+        mode: str = "copy",
+    ) -> None:
+        if mode not in ("copy", "freeze"):
+            raise ValueError("mode 只能是 'copy' 或 'freeze'")
+        self.max_bytes = max_bytes
+        self.size_factor = size_factor
+        self.verify_content = verify_content
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, Hashable], threading.Lock] = {}
+
+    def get(self, file_path: PathLike, loader: Callable[[PathLike], Any]) -> Any:
+        """
+        获取文件的解析结果，未命中或文件已变化时调用 `loader(file_path)` 重新解析
+
+        :param file_path: 文件路径
+        :param loader: 解析函数，如 `load_json_from`、`load_yaml_from`
+        :return: 解析结果（按 `mode` 返回拷贝或只读结构）
+        """
+        path = os.path.abspath(file_path)
+        key = (path, loader)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        digest = _file_digest(path) if self.verify_content else None
+
+        value = self._lookup(key, signature, digest)
+        if value is not _MISSING:
+            return self._export(value)
+
+        with self._key_lock(key):
+            # 等待锁期间其他线程可能已完成解析
+            value = self._lookup(key, signature, digest, count=False)
+            if value is _MISSING:
+                value = loader(path)
+                if self.mode == "freeze":
+                    value = _freeze(value)
+                self._store(key, _CacheEntry(signature, digest, value, stat.st_size))
+        return self._export(value)
+
+    def _export(self, value: Any) -> Any:
+        return _copy_plain(value) if self.mode == "copy" else value
+
+    def _key_lock(self, key: Tuple[str, Hashable]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _lookup(self, key, signature, digest, count: bool = True) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry.signature == signature
+                and entry.digest == digest
+            ):
+                self._entries.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return entry.value
+            if count:
+                self.misses += 1
+            return _MISSING
+
+    def _store(self, key, entry: _CacheEntry) -> None:
+        cost = int(entry.cost * self.size_factor)
+        entry.cost = cost
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.cost
+            if cost > self.max_bytes:
+                return  # 单个文件超过上限时不缓存
+            self._entries[key] = entry
+            self._bytes += cost
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.cost
+                self._key_locks.pop(evicted_key, None)
+                self.evictions += 1
+
+    def invalidate(self, file_path: PathLike) -> None:
+        """删除某个文件的全部缓存"""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self._bytes -= self._entries.pop(key).cost
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """命中/未命中/淘汰次数、条目数与估算占用"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+default_file_cache = ParsedFileCache()
+
+
+def cached_load_json_from(
+    file_path: PathLike, cache: Optional[ParsedFileCache] = None
+) -> Any:
+    """带缓存的 `load_json_from`，默认使用模块级的 `default_file_cache`"""
+    return (cache or default_file_cache).get(file_path, load_json_from)
+
+
+def cached_load_object_json_from(
+    file_path: PathLike, cache: Optional[ParsedFileCache] = None
+) -> Mapping:
+    """带缓存的 `load_object_json_from`"""
+    load_data = cached_load_json_from(file_path, cache)
+    if isinstance(load_data, Mapping):
+        return load_data
+    raise ValueError("target json is not a object.")
+
+
+def cached_load_yaml_from(
+    file_path: PathLike, cache: Optional[ParsedFileCache] = None
+) -> Any:
+    """带缓存的 `load_yaml_from`"""
+    return (cache or default_file_cache).get(file_path, load_yaml_from)
@@ -0,0 +1,225 @@
+import json
+import os
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import tqdm
+
+from .accelerate_util import (
+    ErrorCollector,
+    process_pool_as_completed,
+    thread_pool_stream,
+)
+from .tool_types import PathLike
+
+
+class TaskJournal:
+    """
+    任务完成日志（JSONL），每行记录一个已完成任务的 key 与结果，用于断点续跑。
+
+    写入先进入内存缓冲区，累计 `flush_every` 条或距上次落盘超过 `flush_interval` 秒时
+    一次性写入文件，避免日志写入成为瓶颈。进程崩溃时最多丢失缓冲区中的记录，
+    这些任务会在下次运行时重新执行。
+
+    :param file_path: 日志文件路径，不存在时自动创建
+    :param flush_every: 缓冲多少条记录后落盘
+    :param flush_interval: 距上次落盘超过多少秒后落盘
+    :param fsync: 落盘时是否调用 `os.fsync`，开启后更安全但更慢
+
+    使用示例：
+    >>> with TaskJournal("job.journal.jsonl") as journal:
+    >>>     done = journal.completed_keys()
+    >>>     journal.append("chip_001", {"ok": True})
+    """
+
+    def __init__(
+        self,
+        file_path: PathLike,
+        flush_every: int = 1000,
+        flush_interval: float = 5.0,
+        fsync: bool = False,
+    ) -> None:
+        self.file_path = file_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._file = None
+
+    def load(self) -> Iterable[Tuple[str, Any]]:
+        """逐条读取已落盘的 (key, result)，跳过崩溃时写了一半的行"""
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                yield record["key"], record.get("result")
+
+    def completed_keys(self) -> Set[str]:
+        """已完成任务的 key 集合"""
+        return {key for key, _ in self.load()}
+
+    def append(self, key: str, result: Any) -> None:
+        """记录一个已完成的任务，结果需可被 JSON 序列化"""
+        self._buffer.append(
+            json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n"
+        )
+        if (
+            len(self._buffer) >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """把缓冲区中的记录一次性写入文件"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = open(self.file_path, "a", encoding="utf-8")
+            if self._file.tell() > 0 and not self._ends_with_newline():
+                # 上次崩溃可能留下没有换行符的半行，先补上换行，避免与新记录粘连
+                self._file.write("\n")
+        self._file.write("".join(self._buffer))
+        self._buffer.clear()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.file_path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b"\n"
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TaskJournal":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
+
+def default_task_key(task: Any) -> str:
+    """默认的任务 key：任务参数的 JSON 文本（无法序列化的部分使用 `str`）"""
+    if isinstance(task, str):
+        return task
+    return json.dumps(task, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _keyed_call(func: Callable[..., Any], key: str, task: Any) -> Tuple[str, Any]:
+    """执行任务并带回任务 key，需为模块顶层函数以便进程池 pickle"""
+    return key, func(*task if isinstance(task, (tuple, list)) else (task,))
+
+
+def resumable_executor(
+    func: Callable[..., Any],
+    tasks: Iterable[Union[Any, Tuple[Any, ...], List[Any]]],
+    journal_path: PathLike,
+    key_func: Optional[Callable[[Any], str]] = None,
+    kind: str = "thread",
+    pool_size: Optional[int] = None,
+    flush_every: int = 1000,
+    flush_interval: float = 5.0,
+    load_results: bool = True,
+    desc: str = "断点续跑处理中...",
+    max_errors: Optional[int] = None,
+    dedupe_errors: bool = False,
+) -> Dict[str, Any]:
+    """
+    可断点续跑的批量任务执行：每个任务完成后把 key 与结果追加到日志文件，
+    重新运行时跳过日志中已完成的任务。失败的任务不写入日志，下次运行会重试。
+
+    :param func: 执行任务的函数，返回值需可被 JSON 序列化（进程池时需可被 pickle）
+    :param tasks: 任务列表/可迭代对象，每个任务可以是单参数，也可以是一个元组或列表（多参数）
+    :param journal_path: 日志文件路径（JSONL）
+    :param key_func: 由任务计算唯一 key 的函数，默认为 `default_task_key`
+    :param kind: "thread" 使用 `thread_pool_stream`，"process" 使用 `process_pool_as_completed`
+    :param pool_size: 线程/进程数，为 None 时线程取 60，进程取 CPU 核心数
+    :param flush_every: 日志缓冲多少条记录后落盘
+    :param flush_interval: 日志距上次落盘超过多少秒后落盘
+    :param load_results: 是否把日志中已完成任务的结果一并放入返回值
+    :param desc: 进度条描述信息
+    :param max_errors: 最多保留的错误记录数（抽样），为 None 时全部保留
+    :param dedupe_errors: 是否合并异常类型与信息相同的错误记录
+    :return: 字典 {'results': [], 'errors': [TaskError], 'error_counts': {}, 'skipped': 跳过的任务数}，
+             结果中 None 会被忽略，与 `thread_pool_executor` 一致
+
+    使用示例：
+    >>> result = resumable_executor(
+    >>>     query_chip, load_text_generator("chip_ids.txt"), "query.journal.jsonl"
+    >>> )
+    """
+
+    if kind not in ("thread", "process"):
+        raise ValueError(f"kind 只能是 'thread' 或 'process'，当前为 {kind!r}")
+    if key_func is None:
+        key_func = default_task_key
+
+    results = []
+    errors = ErrorCollector(max_errors, dedupe_errors)
+    done_keys: Set[str] = set()
+    journal = TaskJournal(journal_path, flush_every, flush_interval)
+
+    for key, result in journal.load():
+        if key in done_keys:
+            continue
+        done_keys.add(key)
+        if load_results and result is not None:
+            results.append(result)
+
+    skipped = 0
+
+    def pending_tasks():
+        nonlocal skipped
+        for task in tasks:
+            key = key_func(task)
+            if key in done_keys:
+                skipped += 1
+                continue
+            yield key, task
+
+    worker = partial(_keyed_call, func)
+    total = None
+    if hasattr(tasks, "__len__"):
+        total = max(len(tasks) - len(done_keys), 0)
+
+    with journal:
+        if kind == "thread":
+            for key, result in thread_pool_stream(
+                worker,
+                pending_tasks(),
+                pool_size or 60,
+                desc=desc,
+                total=total,
+                on_error=errors.add,
+            ):
+                journal.append(key, result)
+                if result is not None:
+                    results.append(result)
+        else:
+            with tqdm.tqdm(total=total, desc=desc, leave=True) as pbar:
+                for _, ok, value in process_pool_as_completed(
+                    worker, pending_tasks(), pool_size
+                ):
+                    if ok:
+                        key, result = value
+                        journal.append(key, result)
+                        if result is not None:
+                            results.append(result)
+                    else:
+                        errors.add(value)
+                    pbar.update(1)
+
+    report = errors.to_result(results)
+    report["skipped"] = skipped
+    return report
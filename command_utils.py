@@ -1,6 +1,26 @@
+import os
+import re
+import signal
 import subprocess
+import time
 import traceback
-from typing import Optional
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+
 
 def execute_command(
     cmd: str, max_retries: int = 1, switch: bool = False
@@ -34,3 +54,262 @@ def execute_command(
             if attempt < max_retries - 1:
                 print("🔄 重试中...")
     return cmd
+
+
+class CommandResult:
+    """
+    `run_commands` 中单条命令的执行结果
+
+    :param cmd: 命令（字符串或 argv 列表）
+    :param returncode: 最后一次执行的退出码，超时被终止时为 None
+    :param attempts: 实际执行次数（含重试）
+    :param elapsed: 最后一次执行的耗时（秒）
+    :param timed_out: 最后一次执行是否超时
+    :param stderr_tail: 最后一次执行的 stderr 末尾若干行，便于排查失败原因
+    """
+
+    __slots__ = ("cmd", "returncode", "attempts", "elapsed", "timed_out", "stderr_tail")
+
+    def __init__(
+        self,
+        cmd: Union[str, Sequence[str]],
+        returncode: Optional[int],
+        attempts: int,
+        elapsed: float,
+        timed_out: bool = False,
+        stderr_tail: Optional[List[str]] = None,
+    ) -> None:
+        self.cmd = cmd
+        self.returncode = returncode
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+        self.stderr_tail = stderr_tail or []
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    def __repr__(self) -> str:
+        return (
+            f"CommandResult(cmd={self.cmd!r}, returncode={self.returncode}, "
+            f"attempts={self.attempts}, elapsed={self.elapsed:.2f}, "
+            f"timed_out={self.timed_out})"
+        )
+
+
+# ffmpeg 等工具用 "\r" 刷新进度，同样视为行尾
+_LINE_SEPARATOR = re.compile(rb"\r\n|\r|\n")
+_READ_CHUNK = 64 * 1024
+# 超过该长度仍没有行尾时按该长度切分，避免单行无限增长
+_MAX_LINE_BYTES = 1024 * 1024
+
+
+async def _pump_lines(
+    stream: "asyncio.StreamReader",
+    cmd: Union[str, Sequence[str]],
+    stream_name: str,
+    on_output: Optional[Callable[[Union[str, Sequence[str]], str, str], Any]],
+    tail: Optional[deque],
+) -> None:
+    """
+    逐行读取子进程输出并回调，不在内存中缓存完整输出。
+
+    按块读取后自行切分行（"\n"、"\r\n"、"\r"），不使用 `StreamReader.readline`，
+    后者在单行超过 64KB 时抛出 ValueError。
+    """
+
+    def emit(raw: bytes) -> None:
+        line = raw.decode("utf-8", errors="replace")
+        if tail is not None:
+            tail.append(line)
+        if on_output is not None:
+            on_output(cmd, stream_name, line)
+
+    pending = b""
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        pending += chunk
+        # 末尾的 "\r" 可能与下一块开头的 "\n" 组成一个行尾，留到下一块再切分
+        held = b"\r" if pending.endswith(b"\r") else b""
+        lines = _LINE_SEPARATOR.split(pending[: len(pending) - len(held)])
+        pending = lines.pop() + held
+        for raw in lines:
+            emit(raw)
+        while len(pending) > _MAX_LINE_BYTES:
+            emit(pending[:_MAX_LINE_BYTES])
+            pending = pending[_MAX_LINE_BYTES:]
+    pending = pending.rstrip(b"\r")
+    if pending:
+        emit(pending)
+
+
+def _kill_process(process: "asyncio.subprocess.Process") -> None:
+    if os.name == "posix":
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    elif process.returncode is None:
+        process.kill()
+
+
+async def _run_once(
+    cmd: Union[str, Sequence[str]],
+    timeout: Optional[float],
+    on_output: Optional[Callable[[Union[str, Sequence[str]], str, str], Any]],
+    tail_lines: int,
+) -> Tuple[Optional[int], bool, List[str]]:
+    """执行一次命令，返回 (退出码, 是否超时, stderr 末尾若干行)"""
+    import asyncio
+
+    # POSIX 下放入独立进程组，超时时连同 shell 派生的子进程一起终止
+    options = dict(
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=os.name == "posix",
+    )
+    if isinstance(cmd, str):
+        process = await asyncio.create_subprocess_shell(cmd, **options)
+    else:
+        process = await asyncio.create_subprocess_exec(*cmd, **options)
+
+    stderr_tail: deque = deque(maxlen=tail_lines)
+    communicate = asyncio.gather(
+        _pump_lines(process.stdout, cmd, "stdout", on_output, None),
+        _pump_lines(process.stderr, cmd, "stderr", on_output, stderr_tail),
+        process.wait(),
+    )
+    try:
+        await asyncio.wait_for(communicate, timeout)
+    except asyncio.TimeoutError:
+        _kill_process(process)
+        await process.wait()
+        return None, True, list(stderr_tail)
+    except BaseException:
+        # 读取输出或回调出错：终止子进程后再抛出，由调用方记为失败
+        _kill_process(process)
+        await process.wait()
+        raise
+    return process.returncode, False, list(stderr_tail)
+
+
+async def run_commands_async(
+    cmds: Iterable[Union[str, Sequence[str]]],
+    concurrency: int = 8,
+    timeout: Optional[float] = None,
+    max_retries: int = 1,
+    backoff_base: float = 1.0,
+    backoff_max: float = 30.0,
+    on_output: Optional[Callable[[Union[str, Sequence[str]], str, str], Any]] = None,
+    tail_lines: int = 20,
+    desc: str = "命令执行中...",
+) -> Dict[str, List[CommandResult]]:
+    """
+    `run_commands` 的协程版本，可在已有事件循环中直接 await，参数与返回值相同
+    """
+    # asyncio、tqdm 与 accelerate_util 导入较慢，只使用 execute_command 时不导入
+    import asyncio
+
+    import tqdm
+
+    from .accelerate_util import backoff_delay
+
+    if concurrency < 1:
+        raise ValueError("concurrency 必须大于 0")
+    max_retries = max(max_retries, 1)
+    cmd_iter = iter(cmds)
+    total = len(cmds) if hasattr(cmds, "__len__") else None
+    results: List[CommandResult] = []
+    errors: List[CommandResult] = []
+
+    async def run_one(cmd: Union[str, Sequence[str]]) -> CommandResult:
+        for attempt in range(max_retries):
+            start = time.perf_counter()
+            try:
+                returncode, timed_out, stderr_tail = await _run_once(
+                    cmd, timeout, on_output, tail_lines
+                )
+            except Exception as e:
+                # argv 模式下可执行文件不存在、on_output 回调出错等情况，只记为该命令失败
+                returncode, timed_out, stderr_tail = None, False, [f"{type(e).__name__}: {e}"]
+            result = CommandResult(
+                cmd,
+                returncode,
+                attempt + 1,
+                time.perf_counter() - start,
+                timed_out,
+                stderr_tail,
+            )
+            if result.ok or attempt == max_retries - 1:
+                return result
+            await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_max))
+        return result
+
+    with tqdm.tqdm(total=total, desc=desc, leave=True) as pbar:
+
+        async def worker() -> None:
+            for cmd in cmd_iter:
+                result = await run_one(cmd)
+                (results if result.ok else errors).append(result)
+                pbar.update(1)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return {"results": results, "errors": errors}
+
+
+def run_commands(
+    cmds: Iterable[Union[str, Sequence[str]]],
+    concurrency: int = 8,
+    timeout: Optional[float] = None,
+    max_retries: int = 1,
+    backoff_base: float = 1.0,
+    backoff_max: float = 30.0,
+    on_output: Optional[Callable[[Union[str, Sequence[str]], str, str], Any]] = None,
+    tail_lines: int = 20,
+    desc: str = "命令执行中...",
+) -> Dict[str, List[CommandResult]]:
+    """
+    基于 asyncio 子进程的并发命令执行函数，适合批量执行 obsutil、ffmpeg 等命令
+
+    参数:
+        cmds: 命令列表/可迭代对象。字符串通过 shell 执行；argv 列表（如 ["ffmpeg", "-i", path]）
+              直接执行，不经过 shell，无需转义且启动更快。
+        concurrency (int): 同时运行的命令数上限（默认值: 8）。
+        timeout (float): 单次执行的超时时间（秒），超时后终止子进程，为 None 时不限制。
+        max_retries (int): 每条命令的最大执行次数（含首次，默认值: 1），与 `execute_command` 一致。
+        backoff_base (float): 重试前的指数退避基础等待时间（秒）。
+        backoff_max (float): 单次退避的最长等待时间（秒）。
+        on_output: 逐行输出回调 `on_output(cmd, "stdout" | "stderr", line)`；
+                   为 None 时丢弃输出，不在内存中缓存。
+        tail_lines (int): 失败结果中保留的 stderr 末尾行数。
+        desc (str): 进度条描述信息。
+
+    返回:
+        Dict[str, List[CommandResult]]: {'results': 成功的命令结果, 'errors': 失败的命令结果}，
+        均按完成顺序排列。
+
+    使用示例:
+        >>> cmds = [["obsutil", "cp", src, dst] for src, dst in pairs]
+        >>> report = run_commands(cmds, concurrency=16, timeout=600, max_retries=3)
+        >>> for failed in report["errors"]:
+        >>>     print(failed.cmd, failed.returncode, failed.stderr_tail[-1:])
+    """
+    import asyncio
+
+    return asyncio.run(
+        run_commands_async(
+            cmds,
+            concurrency=concurrency,
+            timeout=timeout,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+            on_output=on_output,
+            tail_lines=tail_lines,
+            desc=desc,
+        )
+    )
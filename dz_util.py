@@ -1,8 +1,11 @@
+from array import array
 from datetime import datetime, timedelta
+import gzip
 from itertools import islice
 import math
 import os
-from typing import List, Tuple
+import zlib
+from typing import Any, Callable, Iterator, List, Mapping, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 
@@ -17,39 +20,122 @@ def get_obs_base_url(obs_url: str) -> str:
     return f"{parsed_url.scheme}://{parsed_url.netloc}/"
 
 
-def split_txt_file(txt_path, split_count):
+def _count_lines(txt_path) -> int:
+    """按块统计文件行数（最后一行没有换行符时也计入），不把文件读入内存"""
+    count = 0
+    last = b"\n"
+    with open(txt_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    return count + (last != b"\n")
+
+
+def _open_part(part_file: str, compress: bool):
+    if compress:
+        return gzip.open(part_file, "wt", encoding="utf-8", compresslevel=6)
+    return open(part_file, "w", encoding="utf-8")
+
+
+def split_txt_file(
+    txt_path,
+    split_count: Optional[int] = None,
+    lines_per_file: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    key_column: Optional[int] = None,
+    delimiter: Optional[str] = None,
+    compress: bool = False,
+) -> List[str]:
     """
     根据txt文档的行数拆分文件,用于多批chip_id划分处理
+
+    逐行流式读写，任何模式下都不会把整个文件读入内存。支持四种拆分方式（按优先级）：
+    - `key_column`：按该列内容的哈希值分到 `split_count` 个文件，相同 ID 总是落在同一个文件；
+    - `lines_per_file`：每个文件最多包含这么多行；
+    - `max_bytes`：每个文件最多这么多字节（UTF-8 编码后，单行超过上限时独占一个文件）；
+    - 仅 `split_count`：平均拆分为 `split_count` 个文件（先统计行数，再流式写出）。
+
     :param txt_path: txt文档路径
     :param split_count: 拆分的文件数量
+    :param lines_per_file: 每个文件的最大行数
+    :param max_bytes: 每个文件的最大字节数
+    :param key_column: 按哈希拆分时使用的列下标（从 0 开始）
+    :param delimiter: 列分隔符，为 None 时按空白字符分列
+    :param compress: 是否输出 gzip 压缩文件（文件名追加 `.gz`）
+    :return: 生成的文件路径列表
     """
-    # 读取原始 TXT 文件的所有内容
-    with open(txt_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
+    # 获取原始文件名（去掉扩展名）
+    base_name, ext = os.path.splitext(txt_path)
+    suffix = ext + (".gz" if compress else "")
 
-    total_lines = len(lines)
-    if split_count > total_lines:
-        print("拆分的文件数量大于总行数，每个文件最多包含一行")
-        split_count = total_lines  # 防止创建过多文件
+    def part_name(i: int) -> str:
+        return f"{base_name}_{i + 1}{suffix}"  # 生成文件名，如 `file_1.txt`
 
-    # 计算每个文件应包含的平均行数
-    lines_per_file = math.ceil(total_lines / split_count)  # 向上取整
+    if key_column is not None:
+        if not split_count:
+            raise ValueError("按哈希拆分时需要指定 split_count")
+        part_files = [part_name(i) for i in range(split_count)]
+        counts = [0] * split_count
+        parts = []
+        try:
+            for part_file in part_files:
+                parts.append(_open_part(part_file, compress))
+            with open(txt_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    columns = line.rstrip("\n").split(delimiter)
+                    key = columns[key_column] if key_column < len(columns) else ""
+                    # crc32 与进程、平台无关，多次运行结果一致（内置 hash 对 str 有随机盐）
+                    index = zlib.crc32(key.encode("utf-8")) % split_count
+                    parts[index].write(line)
+                    counts[index] += 1
+        finally:
+            for part in parts:
+                part.close()
+        for part_file, count in zip(part_files, counts):
+            print(f"生成文件: {part_file}, 包含 {count} 行")
+        return part_files
 
-    # 获取原始文件名（去掉扩展名）
-    base_name, ext = os.path.splitext(txt_path)
+    if lines_per_file is None and max_bytes is None:
+        if not split_count:
+            raise ValueError("需要指定 split_count、lines_per_file 或 max_bytes 之一")
+        total_lines = _count_lines(txt_path)
+        if total_lines == 0:
+            return []
+        if split_count > total_lines:
+            print("拆分的文件数量大于总行数，每个文件最多包含一行")
+            split_count = total_lines  # 防止创建过多文件
 
-    # 生成拆分后的多个文件
-    for i in range(split_count):
-        start_idx = i * lines_per_file
-        end_idx = min((i + 1) * lines_per_file, total_lines)  # 确保不超出范围
-        if start_idx >= total_lines:
-            break  # 避免创建空文件
+        # 计算每个文件应包含的平均行数
+        lines_per_file = math.ceil(total_lines / split_count)  # 向上取整
 
-        part_file = f"{base_name}_{i + 1}{ext}"  # 生成文件名，如 `file_1.txt`
-        with open(part_file, "w", encoding="utf-8") as part:
-            part.writelines(lines[start_idx:end_idx])
+    part_files = []
+    part = None
+    part_lines = part_bytes = 0
 
-        print(f"生成文件: {part_file}, 包含 {end_idx - start_idx} 行")
+    def finish_part() -> None:
+        if part is not None:
+            part.close()
+            print(f"生成文件: {part_files[-1]}, 包含 {part_lines} 行")
+
+    try:
+        with open(txt_path, "r", encoding="utf-8") as file:
+            for line in file:
+                line_bytes = len(line.encode("utf-8")) if max_bytes else 0
+                if part is None or (
+                    (lines_per_file is not None and part_lines >= lines_per_file)
+                    or (max_bytes is not None and part_bytes + line_bytes > max_bytes)
+                ):
+                    finish_part()
+                    part_files.append(part_name(len(part_files)))
+                    part = _open_part(part_files[-1], compress)
+                    part_lines = part_bytes = 0
+                part.write(line)
+                part_lines += 1
+                part_bytes += line_bytes
+    finally:
+        finish_part()
+
+    return part_files
 
 
 def split_datetime(
@@ -58,6 +144,7 @@ def split_datetime(
     """
     日期拆分
     例子:"20250101" "20250201"
+    每天数据量差异较大时，使用按权重均衡的 `plan_datetime_windows`
     """
     start_dt = datetime.strptime(start_date, "%Y-%m-%d")
     end_dt = datetime.strptime(end_date, "%Y-%m-%d")
@@ -93,9 +180,176 @@ def split_datetime(
     return date_splits
 
 
+_GRANULARITY_STEPS = {
+    "day": timedelta(days=1),
+    "hour": timedelta(hours=1),
+    "minute": timedelta(minutes=1),
+}
+_DEFAULT_FORMATS = {
+    "day": "%Y-%m-%d",
+    "hour": "%Y-%m-%d %H:%M:%S",
+    "minute": "%Y-%m-%d %H:%M:%S",
+}
+_INPUT_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y%m%d")
+
+SlotWeight = Union[Callable[[datetime], float], Mapping, None]
+
+
+def _parse_datetime(value: Union[str, datetime]) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    for fmt in _INPUT_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"无法解析的时间: {value!r}")
+
+
+def _matches_format(key: Any, fmt: str) -> bool:
+    if isinstance(key, datetime):
+        return True
+    try:
+        datetime.strptime(key, fmt)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _slot_weight_func(
+    weight: SlotWeight, fmt: str, default_weight: float
+) -> Callable[[datetime], float]:
+    if weight is None:
+        return lambda slot: 1.0
+    if callable(weight):
+        return weight
+    if weight and not any(_matches_format(key, fmt) for key in weight):
+        # 例如按天统计的计数表配合 granularity="hour" 使用时，所有时间片都会落到 default_weight
+        raise ValueError(
+            f"计数表的 key 与时间片格式 {fmt!r} 均不匹配，请检查 granularity 与 fmt，"
+            f"示例 key: {next(iter(weight))!r}"
+        )
+
+    def lookup(slot: datetime) -> float:
+        # 计数表的 key 可以是按 fmt 格式化的字符串，也可以是 datetime
+        value = weight.get(slot.strftime(fmt))
+        if value is None:
+            value = weight.get(slot, default_weight)
+        return value
+
+    return lookup
+
+
+def _balanced_cuts(weights: "array", parallelism: int) -> List[int]:
+    """把连续的时间片按权重切成 parallelism 段，返回每段起始时间片的下标"""
+    total = sum(weights)
+    if total <= 0:
+        weights = array("d", [1.0]) * len(weights)
+        total = float(len(weights))
+    per_window = total / parallelism
+    cuts = [0]
+    k = 1
+    cum_before = 0.0
+    for i, w in enumerate(weights):
+        cum_after = cum_before + w
+        while k < parallelism and cum_after >= k * per_window:
+            target = k * per_window
+            # 选择离第 k 个等分点最近的边界：时间片 i 之前或之后；
+            # 多个等分点落在同一个时间片内时，该时间片单独成为一个窗口，窗口数随之减少
+            cut = i if target - cum_before < cum_after - target else i + 1
+            if cuts[-1] < cut < len(weights):
+                cuts.append(cut)
+            k += 1
+        cum_before = cum_after
+    return cuts
+
+
+def plan_datetime_windows(
+    start: Union[str, datetime],
+    end: Union[str, datetime],
+    parallelism: Optional[int] = None,
+    weight: SlotWeight = None,
+    target_weight: Optional[float] = None,
+    granularity: str = "day",
+    fmt: Optional[str] = None,
+    default_weight: float = 0.0,
+    with_weight: bool = False,
+) -> Iterator[Tuple]:
+    """
+    按数据量均衡的时间窗口规划：把 [start, end) 按 `granularity` 切成时间片，
+    每个时间片带一个权重（如当天的数据量），再合并为若干个连续、总权重接近的窗口，
+    适合替代按天数平均拆分的 `split_datetime`。
+
+    两种模式：
+    - `parallelism`：切成指定数量的窗口，需要先计算全部时间片的权重（每个时间片只占 8 字节），
+      窗口在之后逐个产出；单个时间片的权重超过平均值时窗口数可能少于 `parallelism`。
+    - `target_weight`：每个窗口的总权重不超过目标值（单个时间片超过时独占一个窗口），
+      边计算权重边产出窗口，适合很长的时间范围或分钟级粒度。
+
+    :param start: 开始时间（含），字符串支持 "2025-01-01"、"2025-01-01 08:00:00"、"20250101" 或 datetime
+    :param end: 结束时间（不含）
+    :param parallelism: 窗口数量，与 `target_weight` 二选一
+    :param weight: 时间片的权重：接收时间片开始时间 datetime 的函数，或计数表
+                   （key 为按 `fmt` 格式化的字符串或 datetime），为 None 时每个时间片权重为 1
+    :param target_weight: 每个窗口的目标总权重，与 `parallelism` 二选一
+    :param granularity: 时间片粒度，"day"、"hour" 或 "minute"
+    :param fmt: 输出（以及计数表 key）的时间格式，默认按天为 "%Y-%m-%d"，按小时/分钟为 "%Y-%m-%d %H:%M:%S"
+    :param default_weight: 计数表中不存在的时间片的权重；计数表的 key 全部与 `fmt` 不匹配时
+                           （如按天统计却使用 granularity="hour"）抛出 ValueError
+    :param with_weight: 为 True 时产出 (开始, 结束, 总权重)，否则产出 (开始, 结束)
+    :return: 生成器，按时间顺序产出窗口，可直接作为 `thread_pool_executor` 等执行器的任务
+
+    使用示例：
+    >>> counts = {"2025-01-01": 120000, "2025-01-02": 8000, ...}
+    >>> windows = list(plan_datetime_windows("2025-01-01", "2025-04-01", parallelism=16, weight=counts))
+    >>> result = thread_pool_executor(export_range, windows, pool_size=16)
+    """
+    if (parallelism is None) == (target_weight is None):
+        raise ValueError("parallelism 与 target_weight 需且只能指定一个")
+    if parallelism is not None and parallelism < 1:
+        raise ValueError("parallelism 必须大于 0")
+    if target_weight is not None and target_weight <= 0:
+        raise ValueError("target_weight 必须大于 0")
+    if granularity not in _GRANULARITY_STEPS:
+        raise ValueError(f"granularity 只能是 {list(_GRANULARITY_STEPS)}，当前为 {granularity!r}")
+
+    step = _GRANULARITY_STEPS[granularity]
+    fmt = fmt or _DEFAULT_FORMATS[granularity]
+    start_dt = _parse_datetime(start)
+    end_dt = _parse_datetime(end)
+    slot_count = math.ceil((end_dt - start_dt) / step)
+    if slot_count <= 0:
+        return
+    weight_of = _slot_weight_func(weight, fmt, default_weight)
+
+    def slot_time(i: int) -> datetime:
+        return min(start_dt + step * i, end_dt)
+
+    def window(first: int, stop: int, total: float) -> Tuple:
+        bounds = (slot_time(first).strftime(fmt), slot_time(stop).strftime(fmt))
+        return bounds + (total,) if with_weight else bounds
+
+    if target_weight is not None:
+        first, total = 0, 0.0
+        for i in range(slot_count):
+            w = weight_of(slot_time(i))
+            if i > first and total + w > target_weight:
+                yield window(first, i, total)
+                first, total = i, 0.0
+            total += w
+        yield window(first, slot_count, total)
+        return
+
+    weights = array("d", (weight_of(slot_time(i)) for i in range(slot_count)))
+    cuts = _balanced_cuts(weights, parallelism) + [slot_count]
+    for first, stop in zip(cuts, cuts[1:]):
+        yield window(first, stop, sum(weights[first:stop]))
+
+
 def split_list(lst, n):
     """
     将列表 lst 拆分为 n 份，每份大小尽量均匀。
+    各份任务耗时差异较大时，使用动态派发的 `accelerate_util.guided_executor`。
 
     :param lst: 需要拆分的列表
     :param n: 需要拆分的部分数
@@ -0,0 +1,303 @@
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .cache_utils import _file_digest
+from .scan_utils import Patterns, ScanEntry, _compile_patterns, _scan_one
+from .tool_types import PathLike
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    rel_path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS files (
+    rel_path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    hash TEXT
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+"""
+
+
+class IndexChanges:
+    """
+    `FileIndex.update` 的结果：相对根目录的新增、修改、删除文件路径列表
+
+    :param root: 索引的根目录
+    """
+
+    __slots__ = ("root", "added", "modified", "deleted", "scanned_dirs", "skipped_dirs")
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.added: List[str] = []
+        self.modified: List[str] = []
+        self.deleted: List[str] = []
+        self.scanned_dirs = 0  # 重新列举了内容的目录数
+        self.skipped_dirs = 0  # mtime 未变、直接沿用索引的目录数
+
+    def paths(self, rel_paths: Iterable[str]) -> List[str]:
+        """把相对路径转换为完整路径"""
+        return [os.path.join(self.root, p) for p in rel_paths]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+    def __repr__(self) -> str:
+        return (
+            f"IndexChanges(added={len(self.added)}, modified={len(self.modified)}, "
+            f"deleted={len(self.deleted)}, scanned_dirs={self.scanned_dirs}, "
+            f"skipped_dirs={self.skipped_dirs})"
+        )
+
+
+def _default_db_path(root: str) -> str:
+    # 数据库放在根目录之外：写入数据库及其日志文件会改变根目录的 mtime，导致每次都重新列举根目录
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    name = hashlib.blake2b(root.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(cache_home, "victor", "file_index", f"{name}.sqlite")
+
+
+def _stat_dir(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+class FileIndex:
+    """
+    持久化的增量文件索引（SQLite），记录每个文件的路径、大小、mtime 与可选的内容哈希。
+
+    再次 `update` 时先并行检查每个目录的 mtime：目录 mtime 不变说明其中没有新增、删除
+    或重命名的条目，直接沿用索引，只有变化的目录才重新列举并比对文件。
+    注意：原地修改文件内容不会改变所在目录的 mtime，需要发现这类修改时使用 `verify_files=True`
+    （会重新列举所有目录并比对每个文件的大小与 mtime，但仍比全量 `rglob` 快）。
+
+    :param root: 索引的根目录
+    :param db_path: 索引数据库路径，默认为 `~/.cache/victor/file_index/<根目录路径的哈希>.sqlite`；
+                    放在根目录下时数据库文件不会被编入索引，但每次写入都会改变根目录的 mtime，
+                    根目录本身每次都会被重新列举
+    :param exclude: 排除的通配符模式，规则同 `scan_files`
+    :param extensions: 只索引这些扩展名的文件，规则同 `scan_files`
+    :param hash_files: 是否为新增/修改的文件计算内容哈希（blake2b）
+    :param workers: 并行检查目录的线程数
+
+    使用示例：
+    >>> index = FileIndex("/nas/dataset", extensions=IMAGE_FILE_EXTENSIONS)
+    >>> changes = index.update()
+    >>> for path in changes.paths(changes.added + changes.modified):
+    >>>     process(path)
+    """
+
+    def __init__(
+        self,
+        root: PathLike,
+        db_path: Optional[PathLike] = None,
+        exclude: Patterns = None,
+        extensions: Optional[Iterable[str]] = None,
+        hash_files: bool = False,
+        workers: int = 16,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        if db_path is None:
+            db_path = _default_db_path(self.root)
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = os.fspath(db_path)
+        self.hash_files = hash_files
+        self.workers = workers
+        exclude_patterns = [exclude] if isinstance(exclude, str) else list(exclude or [])
+        # 数据库文件位于根目录下时不能把它自己编入索引
+        exclude_patterns.append(os.path.basename(self.db_path) + "*")
+        self._exclude = _compile_patterns(exclude_patterns)
+        self._extensions = (
+            {e.lower().lstrip(".") for e in extensions} if extensions else None
+        )
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.executescript(_SCHEMA)
+
+    def _full_path(self, rel_path: str) -> str:
+        return os.path.join(self.root, rel_path) if rel_path else self.root
+
+    def _list_dir(self, rel_dir: str) -> Tuple[List[ScanEntry], List[Tuple[str, str]]]:
+        return _scan_one(
+            self._full_path(rel_dir),
+            rel_dir,
+            rel_dir.count("/") + 1 if rel_dir else 0,
+            None,
+            self._exclude,
+            self._extensions,
+            False,
+            False,
+        )
+
+    def _check_dir(self, rel_dir: str, known_mtime: Optional[float], verify: bool):
+        """工作线程中执行：返回 (目录 mtime, 列举结果或 None)，目录不存在时 mtime 为 None"""
+        mtime = _stat_dir(self._full_path(rel_dir))
+        if mtime is None:
+            return None, None
+        if mtime == known_mtime and not verify:
+            return mtime, None
+        return mtime, self._list_dir(rel_dir)
+
+    def _digest(self, rel_path: str) -> Tuple[Optional[str], str]:
+        try:
+            return _file_digest(self._full_path(rel_path)), rel_path
+        except OSError:
+            return None, rel_path  # 列举之后被删除或无法读取
+
+    def _delete_subtree(self, rel_dir: str, changes: IndexChanges) -> None:
+        if not rel_dir:
+            where, params = "1", ()
+        else:
+            # 按前缀精确匹配：LIKE 会把 "_"、"%" 当作通配符，且对 ASCII 大小写不敏感
+            prefix = rel_dir + "/"
+            where, params = "{0} = ? OR substr({0}, 1, ?) = ?", (rel_dir, len(prefix), prefix)
+        rows = self._conn.execute(
+            f"SELECT rel_path FROM files WHERE {where.format('dir')}", params
+        ).fetchall()
+        changes.deleted.extend(row[0] for row in rows)
+        self._conn.execute(f"DELETE FROM files WHERE {where.format('dir')}", params)
+        self._conn.execute(f"DELETE FROM dirs WHERE {where.format('rel_path')}", params)
+
+    def _apply_listing(
+        self,
+        rel_dir: str,
+        entries: List[ScanEntry],
+        subdirs: List[Tuple[str, str]],
+        changes: IndexChanges,
+        to_hash: List[str],
+    ) -> List[str]:
+        """把一个目录的列举结果与索引比对并写入，返回需要继续检查的子目录"""
+        known = {
+            row[0]: (row[1], row[2])
+            for row in self._conn.execute(
+                "SELECT rel_path, size, mtime FROM files WHERE dir = ?", (rel_dir,)
+            )
+        }
+        upserts = []
+        for entry in entries:
+            old = known.pop(entry.rel_path, None)
+            if old is None:
+                changes.added.append(entry.rel_path)
+            elif old != (entry.size, entry.mtime):
+                changes.modified.append(entry.rel_path)
+            else:
+                continue
+            upserts.append((entry.rel_path, rel_dir, entry.size, entry.mtime))
+            to_hash.append(entry.rel_path)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO files (rel_path, dir, size, mtime, hash) "
+            "VALUES (?, ?, ?, ?, NULL)",
+            upserts,
+        )
+        if known:
+            changes.deleted.extend(known)
+            self._conn.executemany(
+                "DELETE FROM files WHERE rel_path = ?", [(p,) for p in known]
+            )
+
+        current = {rel_path for _, rel_path in subdirs}
+        for (gone,) in self._conn.execute(
+            "SELECT rel_path FROM dirs WHERE parent = ?", (rel_dir,)
+        ).fetchall():
+            if gone not in current:
+                self._delete_subtree(gone, changes)
+        return sorted(current)
+
+    def update(self, verify_files: bool = False) -> IndexChanges:
+        """
+        增量更新索引
+
+        :param verify_files: 为 True 时忽略目录 mtime，重新比对所有文件，可以发现原地修改
+        :return: `IndexChanges`，包含新增、修改、删除的文件
+        """
+        changes = IndexChanges(self.root)
+        known_dirs: Dict[str, float] = {
+            row[0]: row[1] for row in self._conn.execute("SELECT rel_path, mtime FROM dirs")
+        }
+        children: Dict[str, List[str]] = {}
+        for row in self._conn.execute("SELECT rel_path, parent FROM dirs"):
+            if row[1] is not None:
+                children.setdefault(row[1], []).append(row[0])
+        to_hash: List[str] = []
+        visited: Set[str] = set()
+
+        with self._conn, ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending: Dict[Future, str] = {}
+
+            def submit(rel_dir: str) -> None:
+                if rel_dir in visited:
+                    return
+                visited.add(rel_dir)
+                future = executor.submit(
+                    self._check_dir, rel_dir, known_dirs.get(rel_dir), verify_files
+                )
+                pending[future] = rel_dir
+
+            submit("")
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_dir = pending.pop(future)
+                    mtime, listing = future.result()
+                    if mtime is None:
+                        self._delete_subtree(rel_dir, changes)
+                        continue
+                    if listing is None:
+                        changes.skipped_dirs += 1
+                        subdirs = children.get(rel_dir, [])
+                    else:
+                        changes.scanned_dirs += 1
+                        subdirs = self._apply_listing(
+                            rel_dir, listing[0], listing[1], changes, to_hash
+                        )
+                        parent = os.path.dirname(rel_dir) if rel_dir else None
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO dirs (rel_path, parent, mtime) "
+                            "VALUES (?, ?, ?)",
+                            (rel_dir, parent, mtime),
+                        )
+                    for subdir in subdirs:
+                        submit(subdir)
+
+            if self.hash_files and to_hash:
+                hashes = list(executor.map(self._digest, to_hash))
+                self._conn.executemany(
+                    "UPDATE files SET hash = ? WHERE rel_path = ?",
+                    [item for item in hashes if item[0] is not None],
+                )
+                gone = {rel_path for digest, rel_path in hashes if digest is None}
+                if gone:
+                    # 哈希时已不存在的文件按删除处理：新增的直接丢弃，原有的记为删除
+                    self._conn.executemany(
+                        "DELETE FROM files WHERE rel_path = ?", [(p,) for p in gone]
+                    )
+                    changes.added = [p for p in changes.added if p not in gone]
+                    changes.deleted.extend(p for p in changes.modified if p in gone)
+                    changes.modified = [p for p in changes.modified if p not in gone]
+
+        return changes
+
+    def files(self) -> Iterator[Tuple[str, int, float, Optional[str]]]:
+        """遍历索引中的全部文件，产出 (相对路径, 大小, mtime, 哈希)"""
+        yield from self._conn.execute("SELECT rel_path, size, mtime, hash FROM files")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "FileIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
@@ -1,12 +1,81 @@
+import gc
+import gzip
+import io
 import json
+import mmap
+import os
+import queue
 import shutil
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional, Union, Dict
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import yaml
 
 from .tool_types import PathLike
 
+try:
+    import orjson
+except ImportError:  # orjson/ujson 为可选依赖，安装后 JSONL 读写自动使用
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，BatchedAppender 不做跨进程加锁
+    fcntl = None
+
+JSON_BACKEND = "orjson" if orjson else "ujson" if ujson else "json"
+
+# 按扩展名自动选择的压缩格式；zstd 需要 zstandard，lz4 需要 lz4，在首次使用时才导入
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".zst": "zstd", ".zstd": "zstd", ".lz4": "lz4"}
+
+
+def compression_of(file_path: PathLike) -> Optional[str]:
+    """根据扩展名判断压缩格式，返回 "gzip"、"zstd"、"lz4" 或 None（不压缩）"""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(os.fspath(file_path))[1].lower())
+
+
+def open_compressed(
+    file_path: PathLike, mode: str = "rb", level: Optional[int] = None
+) -> IO[bytes]:
+    """
+    按扩展名打开二进制文件，.gz/.zst/.lz4 透明压缩/解压，其余扩展名按普通文件打开。
+    压缩格式下追加写入会在文件末尾新增一个压缩帧，读取时自动跨帧读取。
+
+    :param file_path: 文件路径
+    :param mode: "rb"、"wb" 或 "ab"
+    :param level: 压缩级别，为 None 时使用各格式偏重速度的默认值（gzip 6、zstd 3、lz4 0）
+    :return: 二进制文件对象，读取模式下支持逐行迭代
+    """
+    if mode not in ("rb", "wb", "ab"):
+        raise ValueError("mode 只能是 'rb'、'wb' 或 'ab'")
+    compression = compression_of(file_path)
+    if compression is None:
+        return open(file_path, mode)
+    if compression == "gzip":
+        return gzip.open(file_path, mode, compresslevel=6 if level is None else level)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f"读写 {file_path} 需要安装 zstandard") from None
+        if mode == "rb":
+            # 解压读取器不支持 readline，包一层缓冲以便逐行迭代
+            return io.BufferedReader(zstandard.open(file_path, mode))
+        cctx = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return zstandard.open(file_path, mode, cctx=cctx)
+    try:
+        import lz4.frame
+    except ImportError:
+        raise ImportError(f"读写 {file_path} 需要安装 lz4") from None
+    return lz4.frame.open(
+        file_path, mode, compression_level=0 if level is None else level
+    )
+
 
 def load_text_from(file_path: PathLike) -> str:
     """一次性从文件加载并返回文本数据"""
@@ -125,6 +194,7 @@ def append_to_file(
 ):
     """
     将指定内容追加到文本文件末尾，如果文件不存在则自动创建
+    每次调用都会打开、关闭文件；多线程/多进程频繁追加时使用 `BatchedAppender`
 
     :param mode: 书写模式
     :param file_path: 要写入的文件路径（字符串）
@@ -139,6 +209,275 @@ def append_to_file(
         file.write(content)
 
 
+_FLUSH = object()
+_CLOSE = object()
+_APPENDER_FIELDS = (
+    "file_path",
+    "flush_interval",
+    "flush_bytes",
+    "fsync",
+    "max_bytes",
+    "backup_count",
+    "encoding",
+    "add_newline",
+)
+# 子进程中按参数复用的 BatchedAppender，避免进程池每个任务反序列化出一个新的后台线程
+_SHARED_APPENDERS: Dict[Tuple, "BatchedAppender"] = {}
+
+
+class BatchedAppender:
+    """
+    长期打开、可在多线程与多进程中共用的追加写入器，替代逐次打开文件的 `append_to_file`。
+
+    `write` 只把内容放入队列，由后台线程合并成大块写入：缓冲超过 `flush_bytes` 字节，
+    或最早一条内容已等待 `flush_interval` 秒时写入一次。每块内容以一次 `write` 系统调用
+    写入 O_APPEND 打开的文件，并在写入期间持有文件的 flock，多个进程同时追加时各行不会交错。
+    对象可以直接传给进程池：子进程中按参数复用同一个实例，每次 write 直接写入文件，
+    避免子进程被终止时丢失缓冲。轮转以块为单位，单个文件可能略超过 `max_bytes`。
+
+    :param file_path: 文件路径
+    :param flush_interval: 最长缓冲时间（秒）
+    :param flush_bytes: 缓冲达到该字节数时立即写入
+    :param fsync: 落盘策略："never" 交给操作系统；"batch" 每块写入后 fsync；
+        数字表示最多每隔这么多秒 fsync 一次。除 "never" 外，`flush` 与 `close` 时都会 fsync
+    :param max_bytes: 文件超过该大小时轮转为 `<file_path>.1`、`.2` ...，为 None 时不轮转
+    :param backup_count: 轮转时保留的旧文件个数
+    :param encoding: 写入字符串时使用的编码
+    :param add_newline: 是否在每条内容后添加换行符
+
+    使用示例：
+    >>> with BatchedAppender("results.log", max_bytes=512 * 1024 * 1024) as appender:
+    >>>     thread_pool_executor(lambda chip_id: appender.write(query(chip_id)), chip_ids)
+    >>>     appender.write_json({"done": len(chip_ids)})
+    """
+
+    def __init__(
+        self,
+        file_path: PathLike,
+        flush_interval: float = 1.0,
+        flush_bytes: int = 1024 * 1024,
+        fsync: Union[str, float] = "never",
+        max_bytes: Optional[int] = None,
+        backup_count: int = 5,
+        encoding: str = "utf-8",
+        add_newline: bool = True,
+    ) -> None:
+        if not (fsync in ("never", "batch") or isinstance(fsync, (int, float)) and fsync >= 0):
+            raise ValueError("fsync 只能是 'never'、'batch' 或非负秒数")
+        if max_bytes is not None and backup_count < 1:
+            raise ValueError("轮转时 backup_count 必须大于 0")
+        self.file_path = os.fspath(file_path)
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.encoding = encoding
+        self.add_newline = add_newline
+        self._start()
+
+    def _start(self, direct: bool = False) -> None:
+        self.count = 0
+        self.bytes_written = 0
+        self._pid = os.getpid()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._fd = self._open_fd()
+        self._last_fsync = time.monotonic()
+        # 进程池的子进程可能被直接终止（`Pool` 退出时调用 terminate），后台线程中的缓冲会丢失，
+        # 因此传入子进程的实例每次 write 直接写入文件（仍是一次系统调用 + 文件锁）
+        self._direct = direct
+        if direct:
+            self._write_lock = threading.Lock()
+            return
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="BatchedAppender", daemon=True
+        )
+        self._thread.start()
+        import multiprocessing.util
+
+        # 解释器正常退出时写完队列中的内容
+        self._finalizer = multiprocessing.util.Finalize(self, self.close, exitpriority=10)
+
+    def __reduce__(self):
+        state = tuple(getattr(self, name) for name in _APPENDER_FIELDS)
+        return _shared_appender, (state,)
+
+    def _open_fd(self) -> int:
+        return os.open(self.file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def write(self, content: Union[str, bytes]) -> None:
+        """追加一条内容（字符串或字节），立即返回"""
+        if isinstance(content, str):
+            content = content.encode(self.encoding)
+        if self.add_newline:
+            content += b"\n"
+        self._put(content)
+
+    def write_json(self, obj: Any) -> None:
+        """以 JSONL 格式追加一条记录"""
+        self._put(json_dumps_bytes(obj) + b"\n")
+
+    def _put(self, item: Any) -> None:
+        if self._pid != os.getpid():
+            # fork 出的子进程：父进程的后台线程与队列不可用
+            self._start(direct=True)
+        if self._closed:
+            raise ValueError("BatchedAppender 已关闭")
+        if self._error is not None:
+            raise self._error
+        if not self._direct:
+            self._queue.put(item)
+            return
+        with self._write_lock:
+            self.count += 1
+            self._write_block(item, len(item))
+        if self._error is not None:
+            raise self._error
+
+    def flush(self) -> None:
+        """等待此前写入的内容全部写入文件"""
+        if self._direct:
+            with self._write_lock:
+                self._sync(force=True)
+        else:
+            done = threading.Event()
+            self._put((_FLUSH, done))
+            done.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """写完队列中的内容并关闭文件，可重复调用"""
+        if self._closed or self._pid != os.getpid():
+            return
+        self._closed = True
+        if self._direct:
+            with self._write_lock:
+                self._sync(force=True)
+        else:
+            self._queue.put(_CLOSE)
+            self._thread.join()
+            self._finalizer.cancel()
+        os.close(self._fd)
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "BatchedAppender":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
+    def _writer_loop(self) -> None:
+        pending: List[bytes] = []
+        pending_bytes = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, bytes):
+                pending.append(item)
+                pending_bytes += len(item)
+                self.count += 1
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if pending_bytes < self.flush_bytes:
+                    continue
+            if pending:
+                self._write_block(b"".join(pending), pending_bytes)
+                pending.clear()
+                pending_bytes = 0
+                deadline = None
+            if item is _CLOSE or isinstance(item, tuple):
+                if self.fsync != "never":
+                    self._sync(force=True)
+                if item is _CLOSE:
+                    return
+                item[1].set()
+
+    def _write_block(self, block: bytes, size: int) -> None:
+        if self._error is not None:
+            return  # 出错后丢弃之后的内容，错误在下一次调用 write/flush/close 时抛出
+        try:
+            self._lock()
+            try:
+                if self.max_bytes is not None:
+                    self._maybe_rotate(size)
+                view = memoryview(block)
+                while view:
+                    view = view[os.write(self._fd, view) :]
+            finally:
+                self._unlock()
+            self.bytes_written += size
+            self._sync()
+        except BaseException as e:
+            self._error = e
+
+    def _sync(self, force: bool = False) -> None:
+        if self.fsync == "never" or self._error is not None:
+            return
+        now = time.monotonic()
+        if force or self.fsync == "batch" or now - self._last_fsync >= self.fsync:
+            os.fsync(self._fd)
+            self._last_fsync = now
+
+    def _lock(self) -> None:
+        if fcntl is None:
+            return
+        while True:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            # 其他进程可能已在等待期间轮转了文件，此时需改为锁定并写入新文件
+            try:
+                current = os.stat(self.file_path)
+            except FileNotFoundError:
+                current = None
+            opened = os.fstat(self._fd)
+            if current is not None and (current.st_dev, current.st_ino) == (
+                opened.st_dev,
+                opened.st_ino,
+            ):
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = self._open_fd()
+
+    def _unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _maybe_rotate(self, incoming: int) -> None:
+        size = os.fstat(self._fd).st_size
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.file_path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.file_path}.{i + 1}")
+        os.replace(self.file_path, f"{self.file_path}.1")
+        # 已持有旧文件的锁；新文件在 rename 之后才创建，其他进程会在 _lock 中发现并切换
+        old_fd = self._fd
+        self._fd = self._open_fd()
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            fcntl.flock(old_fd, fcntl.LOCK_UN)
+        os.close(old_fd)
+
+
+def _shared_appender(state: Tuple) -> BatchedAppender:
+    appender = _SHARED_APPENDERS.get(state)
+    if appender is None or appender._closed or appender._pid != os.getpid():
+        appender = BatchedAppender.__new__(BatchedAppender)
+        appender.__dict__.update(zip(_APPENDER_FIELDS, state))
+        appender._start(direct=True)
+        _SHARED_APPENDERS[state] = appender
+    return appender
+
+
 def read_jsonl(file_path: str):
     """
     读取 JSONL(JSON Lines)文件,返回 JSON 对象列表
@@ -162,3 +501,471 @@ def json_list_to_jsonl(json_list, jsonl_name):
         for json_obj in json_list:
             json.dump(json_obj, jsonl_file)
             jsonl_file.write("\n")
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """解析 JSON 文本，优先使用 orjson/ujson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    """
+    序列化为 UTF-8 编码的紧凑 JSON（不转义非 ASCII 字符），优先使用 orjson/ujson。
+    orjson 不支持的对象（如超过 64 位的整数、非字符串 key）自动退回标准库。
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    elif ujson is not None:
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_jsonl(
+    file_path: PathLike,
+    strict: bool = False,
+    on_error: Optional[Callable[[int, bytes, Exception], Any]] = None,
+) -> Iterator[Any]:
+    """
+    逐行惰性读取 JSONL 文件，内存占用与文件大小无关。空行会被跳过。
+    .gz/.zst/.lz4 文件自动解压（见 `open_compressed`）。
+
+    :param file_path: JSONL 文件路径
+    :param strict: 为 True 时遇到格式错误的行直接抛出异常，否则跳过该行
+    :param on_error: 跳过格式错误的行时的回调 `on_error(行号, 原始行, 异常)`，行号从 1 开始
+    :return: 生成器，逐个产出每行解析后的 JSON 对象
+    """
+    with open_compressed(file_path, "rb") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json_loads(line)
+            except ValueError as e:  # json.JSONDecodeError / orjson.JSONDecodeError 均为其子类
+                if strict:
+                    raise ValueError(
+                        f"{file_path} 第 {line_no} 行不是合法的 JSON: {e}"
+                    ) from e
+                if on_error is not None:
+                    on_error(line_no, line, e)
+
+
+def iter_jsonl_batches(
+    file_path: PathLike,
+    batch_size: int = 1000,
+    strict: bool = False,
+    on_error: Optional[Callable[[int, bytes, Exception], Any]] = None,
+) -> Iterator[List[Any]]:
+    """
+    按批读取 JSONL 文件，每次产出最多 `batch_size` 条记录组成的列表
+
+    :param file_path: JSONL 文件路径
+    :param batch_size: 每批的记录数
+    :param strict: 与 `iter_jsonl` 相同
+    :param on_error: 与 `iter_jsonl` 相同
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size 必须大于 0")
+    batch = []
+    for record in iter_jsonl(file_path, strict=strict, on_error=on_error):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class JsonlWriter:
+    """
+    带缓冲的 JSONL 写入器：序列化后的记录先累积在内存中，超过 `buffer_size` 字节时
+    一次性写入文件，避免每条记录一次小写入。
+    文件扩展名为 .gz/.zst/.lz4 时（如 "out.jsonl.zst"）流式压缩写入，见 `open_compressed`。
+
+    :param file_path: 输出文件路径
+    :param mode: "w" 覆盖写入，"a" 追加写入
+    :param buffer_size: 缓冲区大小（字节），默认 4MB
+    :param compress_level: 压缩级别，为 None 时使用 `open_compressed` 的默认值
+
+    使用示例：
+    >>> with JsonlWriter("out.jsonl.zst") as writer:
+    >>>     for record in records:
+    >>>         writer.write(record)
+    """
+
+    def __init__(
+        self,
+        file_path: PathLike,
+        mode: str = "w",
+        buffer_size: int = 4 * 1024 * 1024,
+        compress_level: Optional[int] = None,
+    ) -> None:
+        if mode not in ("w", "a"):
+            raise ValueError("mode 只能是 'w' 或 'a'")
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._file = open_compressed(file_path, mode + "b", compress_level)
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+
+    def write(self, obj: Any) -> None:
+        """写入一条记录"""
+        line = json_dumps_bytes(obj) + b"\n"
+        self._buffer.append(line)
+        self._buffered += len(line)
+        self.count += 1
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def write_many(self, objs: Iterable[Any]) -> None:
+        """写入多条记录"""
+        for obj in objs:
+            self.write(obj)
+
+    def flush(self) -> None:
+        """把缓冲区写入文件"""
+        if self._buffer:
+            self._file.write(b"".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
+
+def jsonl_byte_ranges(
+    file_path: PathLike, chunk_bytes: int = 32 * 1024 * 1024
+) -> List[Tuple[int, int]]:
+    """
+    把文件切分为若干个按换行符对齐的字节区间 [start, end)，每个区间约 `chunk_bytes` 字节
+
+    :param file_path: 文件路径
+    :param chunk_bytes: 每个区间的目标大小（字节）
+    :return: 字节区间列表，首尾相接覆盖整个文件
+    """
+    if compression_of(file_path) is not None:
+        raise ValueError(f"{file_path} 是压缩文件，无法按字节区间切分，请使用 iter_jsonl")
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(file_path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with mm:
+        start = 0
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                newline = mm.find(b"\n", end - 1)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _parse_jsonl_range(
+    file_path: PathLike,
+    start: int,
+    end: int,
+    strict: bool,
+    map_func: Optional[Callable[[Any], Any]] = None,
+    collect_errors: bool = False,
+) -> Tuple[List[Any], int, List[Tuple[int, bytes, Exception]]]:
+    """
+    在子进程中通过 mmap 读取并解析一个字节区间内的全部 JSONL 记录
+
+    :return: (记录列表, 区间内的行数, 格式错误的行 [(区间内行号, 原始行, 异常)])；
+             区间内行号从 1 开始，由父进程换算为文件中的行号。
+             `strict=True` 时遇到第一个错误行即停止，`collect_errors=False` 时不收集错误行
+    """
+    records = []
+    errors = []
+    line_count = 0
+    # JSON 解析结果不含循环引用，解析期间关闭 GC，避免大量新对象反复触发分代回收
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(file_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with mm:
+            # 只按 \n 分行，与 `iter_jsonl` 的行号一致（splitlines 还会在单独的 \r 处分行）
+            lines = mm[start:end].split(b"\n")
+        if not lines[-1]:
+            lines.pop()
+        line_count = len(lines)
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json_loads(line)
+            except ValueError as e:
+                if strict:
+                    errors.append((line_no, line, e))
+                    break
+                if collect_errors:
+                    errors.append((line_no, line, e))
+                continue
+            if map_func is not None:
+                record = map_func(record)
+            if record is not None:
+                records.append(record)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return records, line_count, errors
+
+
+def parallel_iter_jsonl(
+    file_path: PathLike,
+    pool_size: Optional[int] = None,
+    chunk_bytes: int = 32 * 1024 * 1024,
+    ordered: bool = True,
+    strict: bool = False,
+    map_func: Optional[Callable[[Any], Any]] = None,
+    on_error: Optional[Callable[[PathLike, int, bytes, Exception], Any]] = None,
+) -> Iterator[Any]:
+    """
+    多进程并行解析单个大 JSONL 文件：按换行符对齐切分字节区间，
+    各进程通过 mmap 读取各自的区间并解析，父进程按区间汇总产出记录。
+
+    解析在子进程中并行完成，但解析结果需要在父进程中反序列化，这部分是串行的；
+    记录越小、越简单，解析本身越快，这部分开销占比越高，加速比越偏离线性。
+    通过 `map_func` 在子进程中完成字段提取或过滤，可以显著减少传回父进程的数据量。
+
+    :param file_path: JSONL 文件路径
+    :param pool_size: 进程数，为 None 时使用 CPU 核心数
+    :param chunk_bytes: 每个区间的大小（字节），越大 IPC 次数越少，越小内存占用越低
+    :param ordered: 为 True 时按文件中的顺序产出，否则按区间完成顺序产出（更快）
+    :param strict: 为 True 时遇到格式错误的行抛出异常（异常信息含文件路径与行号），否则跳过
+    :param map_func: 在子进程中对每条记录执行的函数（需可被 pickle），返回 None 的记录被丢弃
+    :param on_error: 跳过格式错误的行时在父进程中调用的回调 `on_error(文件路径, 行号, 原始行, 异常)`，
+                     行号从 1 开始；比 `iter_jsonl` 的回调多一个文件路径参数，便于多个文件共用。
+                     区间内的错误行在该区间的记录产出之后回调，`ordered=False` 时需等之前的区间
+                     都解析完成、能够确定行号后才回调
+    :return: 生成器，逐个产出解析后的 JSON 对象（或 `map_func` 的返回值）
+
+    使用示例：
+    >>> for record in parallel_iter_jsonl("labels.jsonl", pool_size=16):
+    >>>     handle(record)
+    """
+    from .accelerate_util import process_pool_as_completed
+
+    ranges = jsonl_byte_ranges(file_path, chunk_bytes)
+    if not ranges:
+        return
+    collect_errors = on_error is not None
+    tasks = [
+        (file_path, start, end, strict, map_func, collect_errors) for start, end in ranges
+    ]
+    pending: Dict[int, List[Any]] = {}
+    next_index = 0
+    # 区间的行数依次累加才能得到每个区间第一行的行号，错误行在行号确定后才回调或抛出
+    line_counts: Dict[int, int] = {}
+    range_errors: Dict[int, List[Tuple[int, bytes, Exception]]] = {}
+    counted = 0
+    line_base = 0
+
+    def report_errors() -> None:
+        nonlocal counted, line_base
+        while counted in line_counts:
+            for line_no, line, e in range_errors.pop(counted):
+                if strict:
+                    raise ValueError(
+                        f"{file_path} 第 {line_base + line_no} 行不是合法的 JSON: {e}"
+                    ) from e
+                on_error(file_path, line_base + line_no, line, e)
+            line_base += line_counts.pop(counted)
+            counted += 1
+
+    for index, ok, value in process_pool_as_completed(
+        _parse_jsonl_range, tasks, min(pool_size or os.cpu_count() or 8, len(tasks))
+    ):
+        if not ok:
+            raise RuntimeError(
+                f"解析 {file_path} 失败: {value.exc_type}: {value.message}"
+            )
+        records, line_counts[index], range_errors[index] = value
+        if not ordered:
+            yield from records
+        else:
+            pending[index] = records
+            while next_index in pending:
+                yield from pending.pop(next_index)
+                next_index += 1
+        report_errors()
+
+
+def _zero_copy(src_fd: int, dst_fd: int, size: int) -> None:
+    """
+    在内核中完成文件数据的复制：优先 `os.copy_file_range`（支持的文件系统上可以是 reflink
+    或 NFS 服务端复制），其次 `os.sendfile`，都不可用时退回用户态的分块读写。
+    复制的字节数与 `size` 不一致时抛出 OSError
+    """
+    offset = 0
+    block = 64 * 1024 * 1024
+    for name in ("copy_file_range", "sendfile"):
+        func = getattr(os, name, None)
+        if func is None:
+            continue
+        try:
+            while offset < size:
+                if name == "copy_file_range":
+                    sent = func(src_fd, dst_fd, min(block, size - offset))
+                else:
+                    sent = func(dst_fd, src_fd, offset, min(block, size - offset))
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            if offset > 0:
+                raise
+            # 跨文件系统、不支持的文件类型等情况，换下一种方式
+            continue
+        if offset > 0 or size == 0:
+            break
+        # 部分文件系统（如某些 FUSE、procfs）第一次调用即返回 0，换下一种方式
+    else:
+        while offset < size:
+            data = os.read(src_fd, min(block, size - offset))
+            if not data:
+                break
+            os.write(dst_fd, data)
+            offset += len(data)
+    if offset != size:
+        raise OSError(f"复制不完整：应为 {size} 字节，实际复制 {offset} 字节（源文件可能在复制中被修改）")
+
+
+def fast_copy_file(src: PathLike, dst: PathLike) -> int:
+    """
+    零拷贝复制单个文件，并保留源文件的 mtime（`bulk_copy` 依赖 mtime 判断文件是否变化）
+
+    :param src: 源文件路径
+    :param dst: 目标文件路径，所在目录需已存在
+    :return: 复制的字节数
+    """
+    with open(src, "rb") as fsrc:
+        stat = os.fstat(fsrc.fileno())
+        try:
+            with open(dst, "wb") as fdst:
+                _zero_copy(fsrc.fileno(), fdst.fileno(), stat.st_size)
+        except BaseException:
+            # 不留下不完整的目标文件，否则其大小/mtime 可能被误判为已复制
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+            raise
+    os.utime(dst, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return stat.st_size
+
+
+def _copy_entry(
+    src: str, dst: str, size: int, mtime: float, skip_unchanged: bool
+) -> Tuple[bool, int]:
+    """复制一个文件，返回 (是否实际复制, 字节数)"""
+    if skip_unchanged:
+        try:
+            stat = os.stat(dst)
+        except FileNotFoundError:
+            pass
+        else:
+            if stat.st_size == size and stat.st_mtime == mtime:
+                return False, 0
+            # 扫描得到的是符号链接自身的 stat，而复制的是链接指向的文件，按其 stat 再比较一次
+            src_stat = os.stat(src)
+            if stat.st_size == src_stat.st_size and stat.st_mtime == src_stat.st_mtime:
+                return False, 0
+    return True, fast_copy_file(src, dst)
+
+
+def bulk_copy(
+    src_dir: PathLike,
+    dst_dir: PathLike,
+    pool_size: int = 16,
+    skip_unchanged: bool = True,
+    include=None,
+    exclude=None,
+    extensions: Optional[Iterable[str]] = None,
+    desc: str = "复制文件中...",
+) -> Dict[str, Any]:
+    """
+    并行同步目录：边扫描源目录边复制，适合百万级小文件。单个文件使用零拷贝复制，
+    目标文件大小与 mtime 都与源文件一致时跳过（复制时保留 mtime，因此重复执行只复制变化的文件）。
+    不会删除目标目录中多余的文件。
+
+    :param src_dir: 源目录
+    :param dst_dir: 目标目录，不存在时自动创建
+    :param pool_size: 复制线程数，本地磁盘 8~16 即可，NAS 等高延迟存储可以更大
+    :param skip_unchanged: 是否跳过大小与 mtime 均未变化的文件
+    :param include: 包含的通配符模式，规则同 `scan_files`
+    :param exclude: 排除的通配符模式，规则同 `scan_files`
+    :param extensions: 只复制这些扩展名的文件，规则同 `scan_files`
+    :param desc: 进度条描述信息
+    :return: 字典 {'copied': 复制的文件数, 'skipped': 跳过的文件数, 'bytes': 复制的字节数,
+             'elapsed': 耗时（秒）, 'files_per_sec': 每秒处理的文件数,
+             'mb_per_sec': 每秒复制的 MB 数, 'errors': [TaskError]}
+
+    使用示例：
+    >>> report = bulk_copy("/nas/dataset", "/data/dataset", pool_size=32)
+    >>> print(report["copied"], report["mb_per_sec"])
+    """
+    from .accelerate_util import thread_pool_stream
+    from .scan_utils import scan_files
+
+    src_dir = os.path.abspath(src_dir)
+    dst_dir = os.path.abspath(dst_dir)
+    os.makedirs(dst_dir, exist_ok=True)
+    errors = []
+    copied = skipped = copied_bytes = 0
+    start = time.perf_counter()
+
+    created_dirs = set()
+
+    def tasks():
+        # 目标子目录在提交任务前由主线程创建，复制线程之间无需协调
+        for entry in scan_files(
+            src_dir, include=include, exclude=exclude, extensions=extensions
+        ):
+            dst = os.path.join(dst_dir, entry.rel_path)
+            parent = os.path.dirname(dst)
+            if parent not in created_dirs:
+                os.makedirs(parent, exist_ok=True)
+                created_dirs.add(parent)
+            yield entry.path, dst, entry.size, entry.mtime, skip_unchanged
+
+    for done, size in thread_pool_stream(
+        _copy_entry, tasks(), pool_size, desc=desc, on_error=errors.append
+    ):
+        if done:
+            copied += 1
+            copied_bytes += size
+        else:
+            skipped += 1
+
+    elapsed = time.perf_counter() - start
+    return {
+        "copied": copied,
+        "skipped": skipped,
+        "bytes": copied_bytes,
+        "elapsed": elapsed,
+        "files_per_sec": (copied + skipped) / elapsed if elapsed else 0.0,
+        "mb_per_sec": copied_bytes / 1024 / 1024 / elapsed if elapsed else 0.0,
+        "errors": errors,
+    }
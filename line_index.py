@@ -0,0 +1,252 @@
+import mmap
+import os
+import random
+import struct
+from typing import Iterator, List, Optional, Union
+
+from .tool_types import PathLike
+
+_MAGIC = b"VLIDX001"
+# magic, 文件大小, 文件 mtime_ns, 偏移量个数
+_HEADER = struct.Struct("<8sQqQ")
+_SCAN_BLOCK = 64 * 1024 * 1024
+_ITER_BLOCK_LINES = 65536
+
+
+def _import_numpy():
+    # numpy 为可选依赖，且导入耗时较长，仅在使用 LineIndex 时导入
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("LineIndex 需要安装 numpy") from None
+    return numpy
+
+
+def _scan_offsets(mm: mmap.mmap, size: int):
+    """分块向量化查找换行符，返回每行起始偏移量（末尾附加文件大小），dtype 为 uint64"""
+    np = _import_numpy()
+    parts = [np.zeros(1, dtype=np.uint64)]
+    data = np.frombuffer(mm, dtype=np.uint8)
+    block = None
+    try:
+        for start in range(0, size, _SCAN_BLOCK):
+            block = data[start : start + _SCAN_BLOCK]
+            parts.append((np.flatnonzero(block == 10) + (start + 1)).astype(np.uint64))
+    finally:
+        del data, block  # 释放对 mmap 的引用，否则之后无法关闭
+    offsets = np.concatenate(parts)
+    if offsets[-1] != size:
+        # 最后一行没有换行符
+        offsets = np.append(offsets, np.uint64(size))
+    return offsets
+
+
+class LineSlice:
+    """
+    `LineIndex` 的切片视图：不复制数据，访问时才解码。
+
+    :param index: 所属的 `LineIndex`
+    :param start: 起始行号
+    :param stop: 结束行号（不含）
+    """
+
+    __slots__ = ("index", "start", "stop")
+
+    def __init__(self, index: "LineIndex", start: int, stop: int) -> None:
+        self.index = index
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __iter__(self) -> Iterator[str]:
+        return self.index.iter_lines(self.start, self.stop)
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("line index out of range")
+        return self.index[self.start + i]
+
+    def raw(self) -> memoryview:
+        """切片覆盖的原始字节（含换行符），直接引用 mmap，不复制"""
+        return self.index.raw(self.start, self.stop)
+
+    def __repr__(self) -> str:
+        return f"LineSlice({self.index.file_path!r}, {self.start}, {self.stop})"
+
+
+class LineIndex:
+    """
+    大文本文件的行偏移索引：通过 mmap 与 NumPy 向量化扫描一次换行符，记录每行的起始偏移，
+    之后可以 O(1) 随机访问第 N 行、零拷贝切片，按需解码。
+
+    索引保存在文件旁的 `<文件名>.lineidx` 中（打开时通过 `np.memmap` 映射，不读入内存），
+    文件大小或 mtime 变化后自动重建。所在目录不可写时只在内存中保留索引。
+    行内容与 `load_text_generator` 一致：去掉末尾的 "\\n" 或 "\\r\\n"。
+    行号只按 "\\n" 划分，行内单独的 "\\r" 保留（文本模式会把它当作换行）。
+
+    :param file_path: 文本文件路径
+    :param index_path: 索引文件路径，默认为 `<file_path>.lineidx`
+    :param encoding: 解码使用的编码
+    :param persist: 是否把索引保存到磁盘
+
+    使用示例：
+    >>> with LineIndex("chip_ids.txt") as lines:
+    >>>     print(len(lines), lines[123456], lines[-1])
+    >>>     shard = lines.shard(8, 3)      # 第 4 份（共 8 份），零拷贝
+    >>>     for chip_id in shard:
+    >>>         handle(chip_id)
+    >>>     picked = lines.sample(1000, seed=0)
+    """
+
+    def __init__(
+        self,
+        file_path: PathLike,
+        index_path: Optional[PathLike] = None,
+        encoding: str = "utf-8",
+        persist: bool = True,
+    ) -> None:
+        self.file_path = os.fspath(file_path)
+        self.index_path = os.fspath(index_path or self.file_path + ".lineidx")
+        self.encoding = encoding
+        stat = os.stat(self.file_path)
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+
+        with open(self.file_path, "rb") as file:
+            # 空文件无法 mmap
+            self._mm = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if self._size
+                else None
+            )
+        self._offsets = self._load_index()
+        if self._offsets is None:
+            self._offsets = (
+                _scan_offsets(self._mm, self._size)
+                if self._mm is not None
+                else _import_numpy().zeros(1, dtype="uint64")
+            )
+            if persist:
+                self._save_index()
+        self._count = len(self._offsets) - 1
+
+    def _load_index(self):
+        np = _import_numpy()
+        try:
+            with open(self.index_path, "rb") as file:
+                header = file.read(_HEADER.size)
+        except OSError:
+            return None
+        if len(header) < _HEADER.size:
+            return None
+        magic, size, mtime_ns, count = _HEADER.unpack(header)
+        if magic != _MAGIC or size != self._size or mtime_ns != self._mtime_ns:
+            return None
+        if os.path.getsize(self.index_path) != _HEADER.size + count * 8:
+            return None
+        return np.memmap(
+            self.index_path, dtype="<u8", mode="r", offset=_HEADER.size, shape=(count,)
+        )
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(
+                    _HEADER.pack(_MAGIC, self._size, self._mtime_ns, len(self._offsets))
+                )
+                file.write(self._offsets.astype("<u8").tobytes())
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # 目录只读等情况下不持久化
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _bounds(self, i: int):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("line index out of range")
+        return int(self._offsets[i]), int(self._offsets[i + 1])
+
+    def line_bytes(self, i: int) -> bytes:
+        """第 i 行的原始字节（不含末尾的 "\\n" 或 "\\r\\n"）"""
+        start, end = self._bounds(i)
+        if end > start and self._mm[end - 1] == 10:
+            end -= 1
+        if end > start and self._mm[end - 1] == 13:
+            end -= 1
+        return self._mm[start:end]
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, LineSlice]:
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._count)
+            if step != 1:
+                raise ValueError("LineIndex 切片不支持步长")
+            return LineSlice(self, start, max(start, stop))
+        return self.line_bytes(i).decode(self.encoding)
+
+    def raw(self, start: int, stop: int) -> memoryview:
+        """
+        第 start 行到第 stop 行（不含）的原始字节，直接引用 mmap，不复制。
+        返回的 memoryview 需在 `close` 之前释放
+        """
+        if start >= stop or self._mm is None:
+            return memoryview(b"")
+        return memoryview(self._mm)[int(self._offsets[start]) : int(self._offsets[stop])]
+
+    def iter_lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """逐行解码产出第 start 行到第 stop 行（不含）"""
+        stop = self._count if stop is None else min(stop, self._count)
+        # 每次从 mmap 复制一批行再切分，比逐行切片快，内存占用与范围大小无关
+        for block_start in range(start, stop, _ITER_BLOCK_LINES):
+            block_stop = min(block_start + _ITER_BLOCK_LINES, stop)
+            chunk = self._mm[
+                int(self._offsets[block_start]) : int(self._offsets[block_stop])
+            ]
+            lines = chunk.split(b"\n")
+            if chunk.endswith(b"\n"):
+                lines.pop()
+            if b"\r" in chunk:
+                # CRLF 文件：与 line_bytes 一致去掉行尾的 "\r"
+                lines = [line[:-1] if line.endswith(b"\r") else line for line in lines]
+            for line in lines:
+                yield line.decode(self.encoding)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_lines()
+
+    def shard(self, num_shards: int, shard_id: int) -> LineSlice:
+        """把全部行均分为 num_shards 份，返回第 shard_id 份（从 0 开始）的切片视图"""
+        if not 0 <= shard_id < num_shards:
+            raise ValueError("shard_id 需在 [0, num_shards) 区间内")
+        avg, extra = divmod(self._count, num_shards)
+        start = shard_id * avg + min(shard_id, extra)
+        return LineSlice(self, start, start + avg + (shard_id < extra))
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[str]:
+        """不放回地随机抽取 k 行（按行号顺序返回）"""
+        line_numbers = sorted(random.Random(seed).sample(range(self._count), k))
+        return [self[i] for i in line_numbers]
+
+    def close(self) -> None:
+        # memmap 的索引由垃圾回收释放
+        self._offsets = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self) -> "LineIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
@@ -0,0 +1,174 @@
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .file_utils import JsonlWriter, compression_of, iter_jsonl_batches
+from .tool_types import PathLike
+
+# 列式格式的扩展名，需要 pyarrow，在首次使用时才导入
+COLUMNAR_EXTENSIONS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("读写 Parquet/Arrow 文件需要安装 pyarrow") from None
+    return pyarrow
+
+
+def record_format(file_path: PathLike) -> str:
+    """根据扩展名判断记录文件格式："parquet"、"arrow" 或 "jsonl"（含 .jsonl.gz 等压缩 JSONL）"""
+    path = os.fspath(file_path)
+    if compression_of(path) is not None:
+        return "jsonl"
+    return COLUMNAR_EXTENSIONS.get(os.path.splitext(path)[1].lower(), "jsonl")
+
+
+class ArrowRecordWriter:
+    """
+    Parquet / Arrow IPC 的流式写入器：记录先缓存在内存中，每累计 `batch_rows` 条
+    转换为一个 RecordBatch 写入（Parquet 中即一个 row group），内存占用与记录总数无关。
+
+    表结构由第一批记录推断，也可以通过 `schema` 指定；之后的记录需与之兼容。
+
+    :param file_path: 输出文件路径，扩展名为 .parquet 或 .arrow/.feather
+    :param batch_rows: 每批的记录数
+    :param schema: `pyarrow.Schema`，为 None 时由第一批记录推断
+    :param compression: 压缩格式，如 "zstd"、"lz4"、"snappy"，为 None 时不压缩
+
+    使用示例：
+    >>> with ArrowRecordWriter("labels.parquet") as writer:
+    >>>     writer.write_many(records)
+    """
+
+    def __init__(
+        self,
+        file_path: PathLike,
+        batch_rows: int = 65536,
+        schema: Any = None,
+        compression: Optional[str] = "zstd",
+    ) -> None:
+        self.pa = _import_pyarrow()
+        self.file_path = os.fspath(file_path)
+        self.format = record_format(self.file_path)
+        if self.format not in ("parquet", "arrow"):
+            raise ValueError(f"{file_path} 不是 .parquet/.arrow/.feather 文件")
+        if batch_rows < 1:
+            raise ValueError("batch_rows 必须大于 0")
+        self.batch_rows = batch_rows
+        self.schema = schema
+        self.compression = compression
+        self.count = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """写入一条记录（dict）"""
+        self._buffer.append(record)
+        self.count += 1
+        if len(self._buffer) >= self.batch_rows:
+            self.flush()
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        """写入多条记录"""
+        for record in records:
+            self.write(record)
+
+    def _open(self) -> None:
+        if self.format == "parquet":
+            self._writer = self.pa.parquet.ParquetWriter(
+                self.file_path, self.schema, compression=self.compression or "none"
+            )
+        else:
+            options = self.pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = self.pa.ipc.new_file(self.file_path, self.schema, options=options)
+
+    def flush(self) -> None:
+        """把缓存的记录作为一批写入文件"""
+        if not self._buffer:
+            return
+        batch = self.pa.RecordBatch.from_pylist(self._buffer, schema=self.schema)
+        self._buffer = []
+        if self._writer is None:
+            self.schema = batch.schema
+            self._open()
+        if self.format == "parquet":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write(batch)
+
+    def close(self) -> None:
+        if self._writer is None and not self._buffer and self.schema is not None:
+            self._open()  # 没有任何记录时也生成一个带表结构的空文件
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ArrowRecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
+
+def open_record_writer(
+    file_path: PathLike, **kwargs: Any
+) -> Union[JsonlWriter, ArrowRecordWriter]:
+    """
+    按扩展名创建记录写入器：.parquet/.arrow/.feather 使用 `ArrowRecordWriter`，
+    其余（.jsonl、.jsonl.gz、.jsonl.zst、.jsonl.lz4 等）使用 `JsonlWriter`
+
+    :param file_path: 输出文件路径
+    :param kwargs: 传给对应写入器的参数
+    :return: 写入器，均支持 `write`、`write_many`、`flush`、`close` 与 with 语句
+
+    使用示例：
+    >>> with open_record_writer("result.jsonl.zst") as writer:
+    >>>     for result in thread_pool_stream(query, chip_ids):
+    >>>         writer.write(result)
+    """
+    if record_format(file_path) == "jsonl":
+        return JsonlWriter(file_path, **kwargs)
+    return ArrowRecordWriter(file_path, **kwargs)
+
+
+def iter_record_batches(
+    file_path: PathLike, batch_size: int = 65536, columns: Optional[List[str]] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    按批读取记录文件，格式由扩展名决定，每次产出最多 `batch_size` 条记录（dict）组成的列表
+
+    :param file_path: 记录文件路径
+    :param batch_size: 每批的记录数
+    :param columns: 只读取这些列（仅 Parquet/Arrow 有效，JSONL 需整行解析）
+    """
+    fmt = record_format(file_path)
+    if fmt == "jsonl":
+        yield from iter_jsonl_batches(file_path, batch_size)
+        return
+
+    pa = _import_pyarrow()
+    if fmt == "parquet":
+        parquet_file = pa.parquet.ParquetFile(os.fspath(file_path))
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pylist()
+        return
+    with pa.memory_map(os.fspath(file_path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, batch_size):
+                yield batch.slice(start, batch_size).to_pylist()
+
+
+def iter_records(
+    file_path: PathLike, columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """逐条读取记录文件（JSONL/压缩 JSONL/Parquet/Arrow），格式由扩展名决定"""
+    for batch in iter_record_batches(file_path, columns=columns):
+        yield from batch
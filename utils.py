@@ -3,7 +3,9 @@ import os
 import platform
 import shutil
 import subprocess
-from typing import List
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Mapping, Optional
 from .tool_types import PathLike
 import time
 
@@ -60,38 +62,174 @@ def get_absolute_path(relative_path: PathLike) -> Path:
     return Path(absolute_path)
 
 
-def clean_or_create_folder(folder_path: PathLike):
+def clean_or_create_folder(folder_path: PathLike, fast: bool = False):
     """
     清理已存在的文件夹或创建新文件夹。如果文件夹存在，会先删除再创建。
 
     Args:
         folder_path (PathLike): 要清理或创建的文件夹路径
+        fast (bool): 为 True 时使用 `fast_clean_folder`，立即返回，旧内容在后台删除
 
     Returns:
         None
     """
     folder_path = Path(folder_path)
+    if fast:
+        fast_clean_folder(folder_path, recreate=True)
+        return
     if folder_path.exists():
         shutil.rmtree(folder_path)
 
     folder_path.mkdir(parents=True, exist_ok=True)
 
 
-def clean_folder(folder_path: PathLike):
+def clean_folder(folder_path: PathLike, fast: bool = False):
     """
     清理已存在的文件夹或创建新文件夹
 
     Args:
         folder_path (PathLike): 要清理或创建的文件夹路径
+        fast (bool): 为 True 时使用 `fast_clean_folder`，立即返回，旧内容在后台删除
 
     Returns:
         None
     """
     folder_path = Path(folder_path)
+    if fast:
+        fast_clean_folder(folder_path, recreate=False)
+        return
     if folder_path.exists():
         shutil.rmtree(folder_path)
 
 
+def bulk_delete(
+    folder_path: PathLike,
+    pool_size: int = 16,
+    remove_root: bool = True,
+    progress: bool = True,
+) -> Dict[str, Any]:
+    """
+    并行删除目录树，适合百万级小文件（NAS 上的效果尤其明显）。
+    先边扫描边并行删除文件，再从最深层开始逐层并行删除空目录。
+
+    Args:
+        folder_path (PathLike): 要删除的目录
+        pool_size (int): 删除线程数
+        remove_root (bool): 是否删除目录本身，为 False 时只清空目录
+        progress (bool): 是否显示进度条
+
+    Returns:
+        Dict[str, Any]: {'deleted': 删除的文件数, 'dirs': 删除的目录数, 'elapsed': 耗时（秒）,
+                         'files_per_sec': 每秒删除的文件数, 'errors': [TaskError]}
+
+    Raises:
+        OSError: `folder_path` 是符号链接（与 `shutil.rmtree` 一致，不删除链接指向的目录）
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .accelerate_util import thread_pool_stream
+    from .scan_utils import scan_files
+
+    _check_not_symlink(folder_path)
+    start = time.perf_counter()
+    errors = []
+    dirs_by_depth: Dict[int, List[str]] = {}
+
+    def tasks():
+        for entry in scan_files(folder_path, workers=pool_size, include_dirs=True):
+            if entry.is_dir:
+                dirs_by_depth.setdefault(entry.depth, []).append(entry.path)
+            else:
+                yield entry.path
+
+    deleted = 0
+    for _ in thread_pool_stream(
+        _unlink, tasks(), pool_size, desc="删除文件中...",
+        on_error=errors.append, progress=progress,
+    ):
+        deleted += 1
+
+    removed_dirs = 0
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        for depth in sorted(dirs_by_depth, reverse=True):
+            for ok in executor.map(_rmdir, dirs_by_depth[depth]):
+                removed_dirs += ok
+    if remove_root:
+        removed_dirs += _rmdir(os.fspath(folder_path))
+
+    elapsed = time.perf_counter() - start
+    return {
+        "deleted": deleted,
+        "dirs": removed_dirs,
+        "elapsed": elapsed,
+        "files_per_sec": deleted / elapsed if elapsed else 0.0,
+        "errors": errors,
+    }
+
+
+def _check_not_symlink(folder_path: PathLike) -> None:
+    # os.scandir 会解析根目录的符号链接，继续执行会清空链接指向的（可能在目录树之外的）目录
+    if os.path.islink(folder_path):
+        raise OSError(f"Cannot call rmtree on a symbolic link: {os.fspath(folder_path)}")
+
+
+def _unlink(path: str) -> bool:
+    os.unlink(path)
+    return True
+
+
+def _rmdir(path: str) -> bool:
+    try:
+        os.rmdir(path)
+        return True
+    except OSError:
+        return False  # 目录中还有删除失败的文件
+
+
+def _background_delete(folder_path: Path, pool_size: int) -> None:
+    try:
+        bulk_delete(folder_path, pool_size, remove_root=True, progress=False)
+    except RuntimeError:
+        # 解释器开始退出后线程池不再接受新任务，剩余部分改为串行删除
+        pass
+    shutil.rmtree(folder_path, ignore_errors=True)
+
+
+def fast_clean_folder(
+    folder_path: PathLike, recreate: bool = True, pool_size: int = 16
+) -> Optional[threading.Thread]:
+    """
+    快速清空目录：先把目录重命名到同级的临时名称（瞬间完成），再在后台线程中并行删除。
+    调用返回后原路径立即可用；解释器退出前会等待后台删除完成。
+
+    Args:
+        folder_path (PathLike): 要清空的目录
+        recreate (bool): 是否在原路径重新创建空目录
+        pool_size (int): 后台删除的线程数
+
+    Returns:
+        Optional[threading.Thread]: 执行删除的后台线程，可以 `join()` 等待；目录不存在时返回 None
+
+    Raises:
+        OSError: `folder_path` 是符号链接（与 `shutil.rmtree` 一致）
+    """
+    folder_path = Path(folder_path)
+    _check_not_symlink(folder_path)
+    thread = None
+    if folder_path.exists():
+        trash = folder_path.with_name(f".{folder_path.name}.deleting-{uuid.uuid4().hex[:8]}")
+        os.rename(folder_path, trash)
+        thread = threading.Thread(
+            target=_background_delete,
+            args=(trash, pool_size),
+            name=f"fast_clean_folder:{folder_path.name}",
+        )
+        thread.start()
+    if recreate:
+        folder_path.mkdir(parents=True, exist_ok=True)
+    return thread
+
+
 def clean_file(output_file: str):
     """
     清理临时文件
@@ -172,6 +310,7 @@ def rlist_jsons_of_path(folder_path: PathLike) -> List[Path]:
 def break_list(lst: List, n: int) -> List[List]:
     """
     将一个列表分割成多个小列表，每个小列表包含最多 n 个元素。
+    各批任务耗时差异较大时，使用动态派发的 `accelerate_util.guided_executor`。
 
     Args:
         lst (List): 需要分割的原始列表
@@ -185,13 +324,14 @@ def break_list(lst: List, n: int) -> List[List]:
 
 def timing_decorator(func):
     """
-    测试时间的装饰器
+    测试时间的装饰器，每次调用打印一行耗时，适合临时调试。
+    需要长期统计的热点函数请使用 `metrics_util.timed`（汇总为直方图，支持抽样与导出）。
     """
 
     def wrapper(*args, **kwargs):
-        start_time = time.time()  # 记录开始时间
+        start_time = time.perf_counter()  # 记录开始时间
         result = func(*args, **kwargs)  # 执行被装饰的函数
-        end_time = time.time()  # 记录结束时间
+        end_time = time.perf_counter()  # 记录结束时间
         execution_time = end_time - start_time
         print(f"Function '{func.__name__}' executed in {execution_time:.4f} seconds")
         return result  # 返回函数的结果
@@ -200,10 +340,125 @@ def timing_decorator(func):
 
 
 def fuzzy_get_value(data: dict, key_part: str):
-    """模糊匹配 key,返回匹配的 value 列表"""
+    """模糊匹配 key,返回匹配的 value 列表（逐个扫描，同一个 dict 反复查询时请使用 `FuzzyKeyIndex`）"""
     return [v for k, v in data.items() if key_part in k]
 
 
 def fuzzy_get_keys(data: dict, key_part: str):
-    """模糊匹配 key,返回匹配的 key 列表"""
+    """模糊匹配 key,返回匹配的 key 列表（逐个扫描，同一个 dict 反复查询时请使用 `FuzzyKeyIndex`）"""
     return [k for k in data if key_part in k]
+
+
+class FuzzyKeyIndex:
+    """
+    子串查询的 key 索引：一次构建后，按子串查找 key 的结果与 `fuzzy_get_keys` 相同，
+    但不再逐个扫描全部 key。对每个 key 的所有长度为 n 的子串（n-gram）建立倒排表，
+    查询时只需确认查询串中最稀有的 n-gram 所对应的少量候选 key。
+
+    短于 n 的查询串通常会匹配大量 key，退化为顺序扫描。
+    只支持字符串 key；结果按 key 的加入顺序排列。
+
+    Args:
+        data (Optional[Mapping]): 初始数据，key 需为字符串
+        n (int): n-gram 的长度，越大候选越少，但短于 n 的查询需要顺序扫描
+
+    使用示例：
+    >>> index = FuzzyKeyIndex(labels)
+    >>> index.keys("chip_0")
+    >>> index.batch_values(["chip_0", "chip_1"])
+    >>> index["chip_new"] = {...}
+    >>> del index["chip_old"]
+    """
+
+    def __init__(self, data: Optional[Mapping] = None, n: int = 3) -> None:
+        if n < 1:
+            raise ValueError("n 必须大于 0")
+        self.n = n
+        self._values: Dict[str, Any] = {}
+        self._ids: Dict[str, int] = {}
+        # 下标即 key 的编号，删除的 key 置为 None；倒排表中的编号按加入顺序递增
+        self._keys: List[Optional[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        if data:
+            self.update(data)
+
+    def add(self, key: str, value: Any = None) -> None:
+        """加入（或更新）一个 key"""
+        if key not in self._values:
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._ids[key] = key_id
+            postings = self._postings
+            n = self.n
+            for gram in {key[i : i + n] for i in range(len(key) - n + 1)}:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [key_id]
+                else:
+                    posting.append(key_id)
+        self._values[key] = value
+
+    def update(self, data: Mapping) -> None:
+        """批量加入 key"""
+        for key, value in data.items():
+            self.add(key, value)
+
+    def remove(self, key: str) -> None:
+        """移除一个 key，不存在时抛出 KeyError"""
+        del self._values[key]
+        self._keys[self._ids.pop(key)] = None
+        # 倒排表中的失效编号在查询时跳过，累计过多时整体重建
+        if len(self._keys) > 2 * len(self._values) + 1024:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        values = self._values
+        self._values, self._ids, self._keys, self._postings = {}, {}, [], {}
+        self.update(values)
+
+    __setitem__ = add
+    __delitem__ = remove
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def keys(self, key_part: str) -> List[str]:
+        """包含子串 `key_part` 的 key 列表"""
+        n = self.n
+        if len(key_part) < n:
+            return [key for key in self._values if key_part in key]
+        shortest: List[int] = []
+        for gram in {key_part[i : i + n] for i in range(len(key_part) - n + 1)}:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            if not shortest or len(posting) < len(shortest):
+                shortest = posting
+        keys = self._keys
+        matches = []
+        for key_id in shortest:
+            key = keys[key_id]
+            if key is not None and key_part in key:
+                matches.append(key)
+        return matches
+
+    def values(self, key_part: str) -> List[Any]:
+        """包含子串 `key_part` 的 key 对应的 value 列表"""
+        return [self._values[key] for key in self.keys(key_part)]
+
+    def batch_keys(self, key_parts: Iterable[str]) -> Dict[str, List[str]]:
+        """批量查询，返回 {子串: key 列表}，重复的子串只查询一次"""
+        return {part: self.keys(part) for part in dict.fromkeys(key_parts)}
+
+    def batch_values(self, key_parts: Iterable[str]) -> Dict[str, List[Any]]:
+        """批量查询，返回 {子串: value 列表}"""
+        return {
+            part: [self._values[key] for key in keys]
+            for part, keys in self.batch_keys(key_parts).items()
+        }